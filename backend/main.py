@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import os
 
+try:
+    from .utils.responses import DataForgeJSONResponse
+except ImportError:
+    from utils.responses import DataForgeJSONResponse
+
 # Create necessary directories - handle both regular and AppImage execution
 storage_dir = "./storage"
 uploads_dir = "./storage/uploads"
@@ -30,10 +36,22 @@ os.environ["DATAFORGE_STORAGE_DIR"] = storage_dir
 os.environ["DATAFORGE_UPLOADS_DIR"] = uploads_dir
 os.environ["DATAFORGE_EXPORTS_DIR"] = exports_dir
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop the routers' background tasks"""
+    rag_module = globals().get('rag')
+    if rag_module is not None and hasattr(rag_module, 'start_rag_flusher'):
+        rag_module.start_rag_flusher()
+    yield
+    if rag_module is not None and hasattr(rag_module, 'stop_rag_flusher'):
+        rag_module.stop_rag_flusher()
+
 app = FastAPI(
     title="DataForge Reader API",
     description="API for uploading, parsing, and annotating PDF/EPUB files",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DataForgeJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS middleware for React frontend
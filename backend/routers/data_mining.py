@@ -12,7 +12,11 @@ import os
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.text_analytics import text_analyzer
+try:
+    # Same module object as the other routers, so the spaCy pipeline is loaded only once
+    from ..utils.text_analytics import text_analyzer
+except ImportError:
+    from utils.text_analytics import text_analyzer
 
 router = APIRouter(
     prefix="/mine",
@@ -110,19 +114,28 @@ async def batch_analyze_texts(request: BatchAnalyzeRequest):
         all_keywords = []
         sentiment_scores = []
         
-        for text in request.texts:
+        # Parse all texts in one batch when any requested analysis runs the spaCy pipeline,
+        # running only the components those analyses need
+        analyses = tuple(name for name, requested in [
+            ("entities", request.include_entities),
+            ("keywords", request.include_keywords),
+            ("summary", request.include_summary)
+        ] if requested)
+        docs = text_analyzer.parse_batch(request.texts, analyses) if analyses else [None] * len(request.texts)
+        
+        for text, doc in zip(request.texts, docs):
             analysis = {
                 "text_length": len(text),
                 "language": text_analyzer.detect_language(text)
             }
             
             if request.include_entities:
-                entities = text_analyzer.extract_entities(text)
+                entities = text_analyzer.extract_entities(text, doc)
                 analysis["entities"] = entities
                 all_entities.extend(entities)
             
             if request.include_keywords:
-                keywords = text_analyzer.extract_keywords(text, top_n=request.top_keywords)
+                keywords = text_analyzer.extract_keywords(text, top_n=request.top_keywords, doc=doc)
                 analysis["keywords"] = keywords
                 all_keywords.extend(keywords)
             
@@ -135,7 +148,7 @@ async def batch_analyze_texts(request: BatchAnalyzeRequest):
                 analysis["statistics"] = text_analyzer.extract_statistics(text)
             
             if request.include_summary:
-                analysis["summary"] = text_analyzer.get_text_summary(text)
+                analysis["summary"] = text_analyzer.get_text_summary(text, doc)
             
             results.append(analysis)
         
@@ -13,11 +13,11 @@ router = APIRouter()
 
 # Import the text analyzer for NLP analysis
 try:
-    from ..utils.text_analytics import TextAnalyzer
+    from ..utils.text_analytics import text_analyzer
     NLP_AVAILABLE = True
 except ImportError:
     NLP_AVAILABLE = False
-    TextAnalyzer = None
+    text_analyzer = None
 
 # Get directories from environment variables or use defaults
 def get_storage_dir():
@@ -97,17 +97,23 @@ async def export_data(request: ExportRequest):
         if request.include_annotations:
             annotations = get_annotations_data(request.file_id)
         
-        # Initialize NLP analyzer if needed
-        analyzer = None
-        if request.include_nlp and NLP_AVAILABLE and TextAnalyzer:
+        # Use the shared NLP analyzer if needed (its spaCy pipeline is loaded once per process)
+        analyzer = text_analyzer if request.include_nlp and NLP_AVAILABLE else None
+        
+        # Parse every paragraph in one batched pipe call
+        paragraph_docs = [None] * len(parsed_data)
+        if analyzer:
             try:
-                analyzer = TextAnalyzer()
+                paragraph_docs = analyzer.parse_batch([
+                    paragraph.get("text") if isinstance(paragraph.get("text"), str) else ""
+                    for paragraph in parsed_data
+                ], ("entities", "keywords"))
             except Exception as e:
-                print(f"Warning: Could not initialize NLP analyzer: {e}")
+                print(f"Warning: Batch NLP parsing failed, parsing paragraphs one by one: {e}")
         
         # Combine data
         export_data_list = []
-        for paragraph in parsed_data:
+        for paragraph, doc in zip(parsed_data, paragraph_docs):
             item = {
                 "file_id": request.file_id,
                 "paragraph_id": paragraph.get("id"),
@@ -133,8 +139,8 @@ async def export_data(request: ExportRequest):
             if request.include_nlp and analyzer and text and isinstance(text, str):
                 try:
                     # Perform NLP analysis
-                    entities = analyzer.extract_entities(text)
-                    keywords = analyzer.extract_keywords(text, top_n=10)
+                    entities = analyzer.extract_entities(text, doc)
+                    keywords = analyzer.extract_keywords(text, top_n=10, doc=doc)
                     sentiment = analyzer.analyze_sentiment(text)
                     
                     # Add NLP fields
@@ -317,15 +317,8 @@ async def parse_file(request: ParseRequest):
             )
             
             # Index documents
-            indexed_count = 0
-            for doc in rag_documents:
-                if doc['id'] not in rag_index['embeddings']:
-                    # Create embedding (import the function)
-                    from .rag import create_simple_embedding
-                    embedding = create_simple_embedding(doc['fullText'])
-                    rag_index['embeddings'][doc['id']] = embedding
-                    rag_index['documents'].append(doc)
-                    indexed_count += 1
+            from .rag import add_documents_to_index
+            indexed_count = add_documents_to_index(rag_documents)
             
             # Update stats
             if request.file_id not in rag_index['indexed_datasets']:
@@ -336,9 +329,9 @@ async def parse_file(request: ParseRequest):
             from datetime import datetime
             rag_index['stats']['last_updated'] = datetime.now().isoformat()
             
-            # Save index to disk
-            from .rag import save_rag_index
-            save_rag_index()
+            # Schedule a background save of the index
+            from .rag import mark_rag_index_dirty
+            mark_rag_index_dirty()
             
             print(f"Auto-indexed {indexed_count} paragraphs for RAG search")
             
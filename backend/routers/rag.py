@@ -2,21 +2,36 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
+import atexit
+import functools
 import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 import csv
+import numpy as np
 
 router = APIRouter()
 
-# Get storage directory from environment variable or use default
+# Get storage directory from environment variable or use default.
+# main.py sets the variables before importing routers, so the lookups are
+# cached; call .cache_clear() after changing them at runtime.
+@functools.lru_cache(maxsize=1)
 def get_storage_dir():
     return os.environ.get("DATAFORGE_STORAGE_DIR", "../storage")
 
+@functools.lru_cache(maxsize=1)
 def get_exports_dir():
     return os.environ.get("DATAFORGE_EXPORTS_DIR", "../dataset_exports")
 
+@functools.lru_cache(maxsize=1)
+def get_rag_index_file():
+    return os.path.join(get_storage_dir(), "rag", "rag_index.json")
+
 class RAGDocument(BaseModel):
     id: str
     datasetId: str
@@ -29,6 +44,24 @@ class RAGDocument(BaseModel):
     rowIndex: int
     metadata: Dict[str, Any]
 
+@dataclass(slots=True)
+class RAGDocumentEntry:
+    """Document stored in the in-memory RAG index (slotted to keep large indexes small)"""
+    id: str
+    datasetId: str
+    datasetName: str
+    fullText: str
+    prompt: str
+    completion: str
+    intent: str
+    category: str
+    rowIndex: int
+    metadata: Dict[str, Any]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict in the RAGDocument response shape"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
 class RAGSearchRequest(BaseModel):
     query: str
     topK: Optional[int] = 5
@@ -44,10 +77,20 @@ class RAGBulkIndexRequest(BaseModel):
     dataset_name: str = "ebook_dataset"
     max_documents: Optional[int] = None
 
-# In-memory RAG index (in production, this would be a proper vector database)
+EMBEDDING_DIM = 384  # Standard embedding dimension
+
+# Searches with a threshold at or above this value prune rows block by block
+PRUNED_SEARCH_MIN_THRESHOLD = 0.3
+SEARCH_BLOCK_DIMS = 64
+
+# In-memory RAG index (in production, this would be a proper vector database).
+# Row i of "matrix" (unit-normalized embeddings) and "dataset_ids" belongs to
+# documents[i]; "embeddings" maps a document id to its row.
 rag_index = {
     "documents": [],
     "embeddings": {},
+    "matrix": np.empty((0, EMBEDDING_DIM), dtype=np.float32),
+    "dataset_ids": np.empty(0, dtype=object),
     "indexed_datasets": set(),
     "stats": {
         "total_documents": 0,
@@ -76,30 +119,96 @@ def create_simple_embedding(text: str) -> List[float]:
         embedding.append(float(val))  # Ensure it's a float
     return embedding
 
-def cosine_similarity(a: List[float], b: List[float]) -> float:
-    """Calculate cosine similarity between two vectors"""
-    dot_product = sum(x * y for x, y in zip(a, b))
-    norm_a = sum(x * x for x in a) ** 0.5
-    norm_b = sum(x * x for x in b) ** 0.5
-    return dot_product / (norm_a * norm_b) if norm_a and norm_b else 0
-
-def convert_parsed_data_to_rag_documents(file_id: str, parsed_data: Dict[str, Any], dataset_name: str) -> List[Dict[str, Any]]:
+def create_embeddings(texts: List[str]) -> np.ndarray:
+    """Create simple embeddings for a batch of texts as one (len(texts), 384) matrix"""
+    # Same values as create_simple_embedding, computed for all texts at once
+    hash_vals = np.fromiter((simple_hash(text) % 1000000 for text in texts), dtype=np.float64, count=len(texts))
+    offsets = np.arange(EMBEDDING_DIM, dtype=np.float64)
+    return (((hash_vals[:, None] + offsets) * 0.01) % 2 - 1).astype(np.float32)
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length so cosine similarity is a plain dot product"""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms != 0)
+
+def search_similarities(matrix: np.ndarray, rows: Optional[np.ndarray], query: np.ndarray, threshold: float):
+    """Return (rows, similarities) of unit-normalized matrix rows scoring at least threshold against a unit query
+
+    For high thresholds the dot products are accumulated SEARCH_BLOCK_DIMS dimensions
+    at a time. A row can gain at most the norm of the remaining query dimensions
+    (rows are unit length), so rows whose optimistic bound falls below the
+    threshold are dropped before the rest of their vector is read.
+    """
+    if rows is None:
+        rows = np.arange(len(matrix))
+        candidates = matrix
+    else:
+        candidates = matrix[rows]
+
+    if threshold < PRUNED_SEARCH_MIN_THRESHOLD:
+        similarities = candidates @ query
+        matches = similarities >= threshold
+        return rows[matches], similarities[matches]
+
+    # Norm of query[start:] for every block boundary
+    tail_norms = np.sqrt(np.append(np.cumsum((query * query)[::-1])[::-1], 0.0))
+    similarities = np.zeros(len(rows), dtype=np.float32)
+    for start in range(0, EMBEDDING_DIM, SEARCH_BLOCK_DIMS):
+        end = min(start + SEARCH_BLOCK_DIMS, EMBEDDING_DIM)
+        similarities += candidates[:, start:end] @ query[start:end]
+        alive = similarities + tail_norms[end] + 1e-6 >= threshold
+        if not alive.all():
+            rows, similarities, candidates = rows[alive], similarities[alive], candidates[alive]
+        if not len(rows):
+            break
+
+    matches = similarities >= threshold
+    return rows[matches], similarities[matches]
+
+def add_documents_to_index(documents: List[RAGDocumentEntry]) -> int:
+    """Add documents that are not indexed yet, embedding them in one batch. Returns the number added"""
+    embeddings = rag_index['embeddings']
+    new_documents = []
+    new_ids = set()
+    for doc in documents:
+        doc_id = doc.id
+        if doc_id not in embeddings and doc_id not in new_ids:
+            new_ids.add(doc_id)
+            new_documents.append(doc)
+
+    if not new_documents:
+        return 0
+
+    first_row = len(rag_index['documents'])
+    new_matrix = normalize_rows(create_embeddings([doc.fullText for doc in new_documents]))
+    rag_index['matrix'] = np.vstack([rag_index['matrix'], new_matrix])
+    rag_index['dataset_ids'] = np.concatenate([
+        rag_index['dataset_ids'],
+        np.array([doc.datasetId for doc in new_documents], dtype=object)
+    ])
+    rag_index['documents'].extend(new_documents)
+    for row, doc in enumerate(new_documents, first_row):
+        embeddings[doc.id] = row
+
+    return len(new_documents)
+
+def convert_parsed_data_to_rag_documents(file_id: str, parsed_data: Dict[str, Any], dataset_name: str) -> List[RAGDocumentEntry]:
     """Convert parsed paragraph data to RAG document format"""
     rag_documents = []
 
     for idx, paragraph in enumerate(parsed_data.get('paragraphs', [])):
         # Create RAG document
-        rag_doc = {
-            "id": f"{file_id}_{paragraph['id']}",
-            "datasetId": file_id,
-            "datasetName": dataset_name,
-            "fullText": paragraph['text'],
-            "prompt": paragraph['text'],
-            "completion": paragraph['text'],
-            "intent": "content",  # Could be enhanced with NLP
-            "category": "paragraph",
-            "rowIndex": idx,
-            "metadata": {
+        rag_doc = RAGDocumentEntry(
+            id=f"{file_id}_{paragraph['id']}",
+            datasetId=file_id,
+            datasetName=dataset_name,
+            fullText=paragraph['text'],
+            prompt=paragraph['text'],
+            completion=paragraph['text'],
+            intent="content",  # Could be enhanced with NLP
+            category="paragraph",
+            rowIndex=idx,
+            metadata={
                 "page": paragraph.get('page', 1),
                 "paragraph_index": paragraph.get('paragraph_index', idx),
                 "word_count": paragraph.get('word_count', 0),
@@ -107,12 +216,12 @@ def convert_parsed_data_to_rag_documents(file_id: str, parsed_data: Dict[str, An
                 "annotations": paragraph.get('annotations', {}),
                 "extraction_method": parsed_data.get('extraction_method', 'unknown')
             }
-        }
+        )
         rag_documents.append(rag_doc)
 
     return rag_documents
 
-def convert_dataset_to_rag_documents(dataset: Dict[str, Any]) -> List[Dict[str, Any]]:
+def convert_dataset_to_rag_documents(dataset: Dict[str, Any]) -> List[RAGDocumentEntry]:
     """Convert dataset rows to RAG document format"""
     rag_documents = []
 
@@ -136,18 +245,18 @@ def convert_dataset_to_rag_documents(dataset: Dict[str, Any]) -> List[Dict[str,
         full_text = " | ".join(text_parts) if text_parts else f"Row {idx}"
 
         # Create RAG document
-        rag_doc = {
-            "id": f"{dataset['id']}_row_{idx}",
-            "datasetId": dataset["id"],
-            "datasetName": dataset["name"],
-            "fullText": full_text,
-            "prompt": full_text,
-            "completion": full_text,
-            "intent": "data",  # Dataset row data
-            "category": "dataset_row",
-            "rowIndex": idx,
-            "metadata": metadata
-        }
+        rag_doc = RAGDocumentEntry(
+            id=f"{dataset['id']}_row_{idx}",
+            datasetId=dataset["id"],
+            datasetName=dataset["name"],
+            fullText=full_text,
+            prompt=full_text,
+            completion=full_text,
+            intent="data",  # Dataset row data
+            category="dataset_row",
+            rowIndex=idx,
+            metadata=metadata
+        )
         rag_documents.append(rag_doc)
 
     return rag_documents
@@ -172,14 +281,7 @@ async def index_document_for_rag(request: RAGIndexRequest):
         rag_documents = convert_parsed_data_to_rag_documents(request.file_id, parsed_data, dataset_name)
 
         # Index documents
-        indexed_count = 0
-        for doc in rag_documents:
-            if doc['id'] not in rag_index['embeddings']:
-                # Create embedding
-                embedding = create_simple_embedding(doc['fullText'])
-                rag_index['embeddings'][doc['id']] = embedding
-                rag_index['documents'].append(doc)
-                indexed_count += 1
+        indexed_count = add_documents_to_index(rag_documents)
 
         # Update stats
         if request.file_id not in rag_index['indexed_datasets']:
@@ -189,8 +291,8 @@ async def index_document_for_rag(request: RAGIndexRequest):
         rag_index['stats']['total_documents'] += indexed_count
         rag_index['stats']['last_updated'] = datetime.now().isoformat()
 
-        # Save index to disk
-        save_rag_index()
+        # Schedule a background save of the index
+        mark_rag_index_dirty()
 
         return JSONResponse(
             status_code=200,
@@ -208,60 +310,56 @@ async def index_document_for_rag(request: RAGIndexRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"RAG indexing failed: {str(e)}")
 
+def _do_rag_search(request: RAGSearchRequest) -> Dict[str, Any]:
+    """Search indexed documents and return the response content"""
+    if not rag_index['documents']:
+        return {
+            "results": [],
+            "total_results": 0,
+            "message": "No documents indexed yet"
+        }
+
+    # Create query embedding
+    query_embedding = normalize_rows(create_embeddings([request.query]))[0]
+
+    # Filter documents if dataset IDs specified
+    documents = rag_index['documents']
+    rows = None
+    if request.datasetIds:
+        rows = np.flatnonzero(np.isin(rag_index['dataset_ids'], np.array(request.datasetIds, dtype=object)))
+
+    # Calculate similarities for all candidate rows at once
+    threshold_value = request.threshold if request.threshold is not None else 0.1
+    rows, similarities = search_similarities(rag_index['matrix'], rows, query_embedding, threshold_value)
+
+    # Sort by similarity and limit results
+    order = np.argsort(-similarities, kind='stable')[:request.topK]
+    limited_results = []
+    for i in order:
+        similarity = float(similarities[i])
+        limited_results.append({
+            "document": documents[rows[i]].to_dict(),
+            "similarity": similarity,
+            "relevanceScore": similarity
+        })
+
+    return {
+        "results": limited_results,
+        "total_results": len(limited_results),
+        "query": request.query,
+        "search_parameters": {
+            "topK": request.topK,
+            "threshold": request.threshold,
+            "datasetIds": request.datasetIds,
+            "searchIn": request.searchIn
+        }
+    }
+
 @router.post("/rag/search")
 async def search_rag(request: RAGSearchRequest):
     """Search indexed documents using RAG"""
     try:
-        if not rag_index['documents']:
-            return JSONResponse(
-                status_code=200,
-                content={
-                    "results": [],
-                    "total_results": 0,
-                    "message": "No documents indexed yet"
-                }
-            )
-
-        # Create query embedding
-        query_embedding = create_simple_embedding(request.query)
-
-        # Filter documents if dataset IDs specified
-        search_documents = rag_index['documents']
-        if request.datasetIds:
-            search_documents = [doc for doc in search_documents if doc['datasetId'] in request.datasetIds]
-
-        # Calculate similarities
-        results = []
-        threshold_value = request.threshold if request.threshold is not None else 0.1
-        for doc in search_documents:
-            doc_embedding = rag_index['embeddings'].get(doc['id'])
-            if doc_embedding:
-                similarity = cosine_similarity(query_embedding, doc_embedding)
-                if similarity >= threshold_value:
-                    results.append({
-                        "document": doc,
-                        "similarity": similarity,
-                        "relevanceScore": similarity
-                    })
-
-        # Sort by similarity and limit results
-        results.sort(key=lambda x: x['similarity'], reverse=True)
-        limited_results = results[:request.topK]
-
-        return JSONResponse(
-            status_code=200,
-            content={
-                "results": limited_results,
-                "total_results": len(limited_results),
-                "query": request.query,
-                "search_parameters": {
-                    "topK": request.topK,
-                    "threshold": request.threshold,
-                    "datasetIds": request.datasetIds,
-                    "searchIn": request.searchIn
-                }
-            }
-        )
+        return JSONResponse(status_code=200, content=_do_rag_search(request))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"RAG search failed: {str(e)}")
@@ -271,20 +369,7 @@ async def build_rag_context(request: RAGSearchRequest):
     """Build context from RAG search results"""
     try:
         # First perform search
-        search_response = await search_rag(request)
-        
-        # Extract body content properly
-        if hasattr(search_response, 'body'):
-            search_data = search_response.body
-            if isinstance(search_data, bytes):
-                search_data = json.loads(search_data.decode('utf-8'))
-            elif isinstance(search_data, (bytearray, memoryview)):
-                search_data = json.loads(bytes(search_data).decode('utf-8'))
-        else:
-            # If it's already a dict or JSONResponse content
-            search_data = search_response if isinstance(search_response, dict) else {}
-
-        results = search_data.get('results', []) if isinstance(search_data, dict) else []
+        results = _do_rag_search(request)['results']
 
         if not results:
             return JSONResponse(
@@ -310,16 +395,14 @@ async def build_rag_context(request: RAGSearchRequest):
         # Build full prompt
         system_prompt = "You are a helpful document analysis assistant."
         context_section = "\n".join([
-            f"[Context {i+1}] (Relevance: {(ctx['relevanceScore'] * 100):.1f}%)\n" +
-            f"Source: {ctx['source']}\n" +
-            f"Content: {ctx['content']}\n"
+            f"[Context {i+1}] (Relevance: {(ctx['relevanceScore'] * 100):.1f}%)\nSource: {ctx['source']}\nContent: {ctx['content']}\n"
             for i, ctx in enumerate(context_parts)
         ])
 
         full_prompt = (
-            f"{system_prompt}\n\n" +
-            f"Retrieved Context:\n{context_section}\n" +
-            f"User Query: {request.query}\n\n" +
+            f"{system_prompt}\n\n"
+            f"Retrieved Context:\n{context_section}\n"
+            f"User Query: {request.query}\n\n"
             "Please answer the user's query using the provided context when relevant."
         )
 
@@ -356,25 +439,28 @@ async def remove_rag_dataset(dataset_id: str):
             raise HTTPException(status_code=404, detail="Dataset not found in RAG index")
 
         # Remove documents and embeddings for this dataset
-        rag_index['documents'] = [doc for doc in rag_index['documents'] if doc['datasetId'] != dataset_id]
+        documents = rag_index['documents']
+        keep_rows = np.flatnonzero(rag_index['dataset_ids'] != dataset_id)
+        removed_count = len(documents) - len(keep_rows)
 
-        embeddings_to_remove = [doc_id for doc_id in rag_index['embeddings'].keys() if doc_id.startswith(f"{dataset_id}_")]
-        for doc_id in embeddings_to_remove:
-            del rag_index['embeddings'][doc_id]
+        rag_index['documents'] = [documents[row] for row in keep_rows]
+        rag_index['matrix'] = rag_index['matrix'][keep_rows]
+        rag_index['dataset_ids'] = rag_index['dataset_ids'][keep_rows]
+        rag_index['embeddings'] = {doc.id: row for row, doc in enumerate(rag_index['documents'])}
 
         rag_index['indexed_datasets'].remove(dataset_id)
         rag_index['stats']['indexed_datasets'] -= 1
         rag_index['stats']['total_documents'] = len(rag_index['documents'])
         rag_index['stats']['last_updated'] = datetime.now().isoformat()
 
-        # Save updated index
-        save_rag_index()
+        # Schedule a background save of the updated index
+        mark_rag_index_dirty()
 
         return JSONResponse(
             status_code=200,
             content={
                 "message": f"Successfully removed dataset {dataset_id} from RAG index",
-                "removed_documents": len(embeddings_to_remove)
+                "removed_documents": removed_count
             }
         )
 
@@ -390,16 +476,19 @@ async def index_ebook_dataset(request: RAGBulkIndexRequest):
         storage_dir = get_storage_dir()
         cache_dir = os.path.join(storage_dir, "cache")
 
-        if not os.path.exists(cache_dir):
-            raise HTTPException(status_code=404, detail="No cache directory found. No documents have been parsed yet.")
-
         # Find all parsed JSON files
-        parsed_files = [f for f in os.listdir(cache_dir) if f.endswith('_parsed.json')]
+        try:
+            with os.scandir(cache_dir) as entries:
+                parsed_files = [
+                    entry.name for entry in entries
+                    if entry.name.endswith('_parsed.json') and entry.is_file()
+                ]
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="No cache directory found. No documents have been parsed yet.")
 
         if not parsed_files:
             raise HTTPException(status_code=404, detail="No parsed documents found in cache.")
 
-        total_indexed = 0
         failed_files = []
         dataset_id = f"bulk_{request.dataset_name}_{int(time.time())}"
 
@@ -407,35 +496,33 @@ async def index_ebook_dataset(request: RAGBulkIndexRequest):
         if request.max_documents:
             parsed_files = parsed_files[:request.max_documents]
 
-        for parsed_file in parsed_files:
+        def load_parsed_file(parsed_file: str):
+            file_id = parsed_file.replace('_parsed.json', '')
             try:
-                file_id = parsed_file.replace('_parsed.json', '')
-                cache_file = os.path.join(cache_dir, parsed_file)
-
-                # Load parsed data
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    parsed_data = json.load(f)
-
-                # Convert to RAG format
-                dataset_name = request.dataset_name
-                rag_documents = convert_parsed_data_to_rag_documents(file_id, parsed_data, dataset_name)
-
-                # Index documents
-                file_indexed_count = 0
-                for doc in rag_documents:
-                    if doc['id'] not in rag_index['embeddings']:
-                        # Create embedding
-                        embedding = create_simple_embedding(doc['fullText'])
-                        rag_index['embeddings'][doc['id']] = embedding
-                        rag_index['documents'].append(doc)
-                        file_indexed_count += 1
-
-                total_indexed += file_indexed_count
-                print(f"Indexed {file_indexed_count} paragraphs from {file_id}")
-
+                with open(os.path.join(cache_dir, parsed_file), 'r', encoding='utf-8') as f:
+                    return file_id, json.load(f), None
             except Exception as e:
-                failed_files.append({"file_id": file_id, "error": str(e)})
-                print(f"Failed to index {file_id}: {e}")
+                return file_id, None, e
+
+        # Load parsed files concurrently (IO bound), then embed everything in one batch
+        bulk_documents = []
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for file_id, parsed_data, error in executor.map(load_parsed_file, parsed_files):
+                try:
+                    if error is not None:
+                        raise error
+
+                    # Convert to RAG format
+                    rag_documents = convert_parsed_data_to_rag_documents(file_id, parsed_data, request.dataset_name)
+                    bulk_documents.extend(rag_documents)
+                    print(f"Loaded {len(rag_documents)} paragraphs from {file_id}")
+
+                except Exception as e:
+                    failed_files.append({"file_id": file_id, "error": str(e)})
+                    print(f"Failed to index {file_id}: {e}")
+
+        # Index documents
+        total_indexed = add_documents_to_index(bulk_documents)
 
         # Update stats
         if dataset_id not in rag_index['indexed_datasets']:
@@ -445,8 +532,8 @@ async def index_ebook_dataset(request: RAGBulkIndexRequest):
         rag_index['stats']['total_documents'] += total_indexed
         rag_index['stats']['last_updated'] = datetime.now().isoformat()
 
-        # Save index to disk
-        save_rag_index()
+        # Schedule a background save of the index
+        mark_rag_index_dirty()
 
         response_data = {
             "message": f"Successfully indexed ebook dataset '{request.dataset_name}'",
@@ -480,14 +567,7 @@ async def index_exported_dataset_for_rag(request: RAGIndexRequest):
         rag_documents = convert_dataset_to_rag_documents(dataset)
 
         # Index documents
-        indexed_count = 0
-        for doc in rag_documents:
-            if doc['id'] not in rag_index['embeddings']:
-                # Create embedding
-                embedding = create_simple_embedding(doc['fullText'])
-                rag_index['embeddings'][doc['id']] = embedding
-                rag_index['documents'].append(doc)
-                indexed_count += 1
+        indexed_count = add_documents_to_index(rag_documents)
 
         # Update stats
         if request.file_id not in rag_index['indexed_datasets']:
@@ -497,8 +577,8 @@ async def index_exported_dataset_for_rag(request: RAGIndexRequest):
         rag_index['stats']['total_documents'] += indexed_count
         rag_index['stats']['last_updated'] = datetime.now().isoformat()
 
-        # Save index to disk
-        save_rag_index()
+        # Schedule a background save of the index
+        mark_rag_index_dirty()
 
         return JSONResponse(
             status_code=200,
@@ -540,20 +620,20 @@ async def get_indexed_datasets():
         # Group documents by datasetId
         datasets_info = {}
         for doc in rag_index['documents']:
-            dataset_id = doc['datasetId']
+            dataset_id = doc.datasetId
             if dataset_id not in datasets_info:
                 datasets_info[dataset_id] = {
                     "datasetId": dataset_id,
-                    "datasetName": doc['datasetName'],
+                    "datasetName": doc.datasetName,
                     "documentCount": 0,
-                    "category": doc.get('category', 'unknown'),
+                    "category": doc.category,
                     "documents": []
                 }
             datasets_info[dataset_id]["documentCount"] += 1
             datasets_info[dataset_id]["documents"].append({
-                "id": doc['id'],
-                "rowIndex": doc.get('rowIndex', 0),
-                "textPreview": doc['fullText'][:100] + "..." if len(doc['fullText']) > 100 else doc['fullText']
+                "id": doc.id,
+                "rowIndex": doc.rowIndex,
+                "textPreview": doc.fullText[:100] + "..." if len(doc.fullText) > 100 else doc.fullText
             })
         
         # Convert to list
@@ -571,43 +651,69 @@ async def get_indexed_datasets():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get indexed datasets: {str(e)}")
 
-def save_rag_index():
-    """Save RAG index to disk"""
-    try:
-        storage_dir = get_storage_dir()
-        rag_dir = os.path.join(storage_dir, "rag")
-        os.makedirs(rag_dir, exist_ok=True)
+def _rag_index_snapshot() -> Dict[str, Any]:
+    """Copy the parts of the RAG index that get saved, cheaply enough to do on the event loop"""
+    # The matrix is replaced on every change, never modified in place, so a reference is enough
+    return {
+        "documents": list(rag_index['documents']),
+        "matrix": rag_index['matrix'],
+        "indexed_datasets": list(rag_index['indexed_datasets']),
+        "stats": dict(rag_index['stats'])
+    }
+
+# Serializes writers of the index file (the background flusher thread and shutdown/atexit saves)
+_save_lock = threading.Lock()
 
-        index_file = os.path.join(rag_dir, "rag_index.json")
+def write_rag_index(snapshot: Dict[str, Any]) -> bool:
+    """Serialize a RAG index snapshot to disk, returning False if the save failed"""
+    try:
+        index_file = get_rag_index_file()
+        os.makedirs(os.path.dirname(index_file), exist_ok=True)
 
         # Prepare data for serialization
+        documents = snapshot['documents']
         save_data = {
-            "documents": rag_index['documents'],
-            "embeddings": dict(rag_index['embeddings']),  # Convert Map to dict
-            "indexed_datasets": list(rag_index['indexed_datasets']),
-            "stats": rag_index['stats'],
+            "documents": [doc.to_dict() for doc in documents],
+            "embeddings": {doc.id: embedding for doc, embedding in zip(documents, snapshot['matrix'].tolist())},
+            "indexed_datasets": snapshot['indexed_datasets'],
+            "stats": snapshot['stats'],
             "saved_at": datetime.now().isoformat()
         }
 
-        with open(index_file, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, indent=2, ensure_ascii=False)
+        # Compact output: the index holds every embedding and is only read back by load_rag_index
+        with _save_lock, open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(save_data, f, ensure_ascii=False)
+        return True
 
     except Exception as e:
         print(f"Warning: Could not save RAG index: {e}")
+        return False
+
+def save_rag_index() -> bool:
+    """Save RAG index to disk, returning False if the save failed"""
+    return write_rag_index(_rag_index_snapshot())
 
 def load_rag_index():
     """Load RAG index from disk"""
     try:
-        storage_dir = get_storage_dir()
-        rag_dir = os.path.join(storage_dir, "rag")
-        index_file = os.path.join(rag_dir, "rag_index.json")
+        index_file = get_rag_index_file()
 
         if os.path.exists(index_file):
             with open(index_file, 'r', encoding='utf-8') as f:
                 save_data = json.load(f)
 
-            rag_index['documents'] = save_data.get('documents', [])
-            rag_index['embeddings'] = {k: v for k, v in save_data.get('embeddings', {}).items()}
+            # Keep only documents that have a saved embedding, in matrix row order
+            saved_embeddings = save_data.get('embeddings', {})
+            documents = [
+                RAGDocumentEntry(**doc) for doc in save_data.get('documents', [])
+                if doc['id'] in saved_embeddings
+            ]
+            rag_index['documents'] = documents
+            rag_index['embeddings'] = {doc.id: row for row, doc in enumerate(documents)}
+            rag_index['matrix'] = normalize_rows(np.array(
+                [saved_embeddings[doc.id] for doc in documents], dtype=np.float32
+            ).reshape(-1, EMBEDDING_DIM))
+            rag_index['dataset_ids'] = np.array([doc.datasetId for doc in documents], dtype=object)
             rag_index['indexed_datasets'] = set(save_data.get('indexed_datasets', []))
             rag_index['stats'] = save_data.get('stats', rag_index['stats'])
 
@@ -619,6 +725,53 @@ def load_rag_index():
 # Load index on startup
 load_rag_index()
 
+# Index saves are debounced: handlers only mark the index dirty and a background
+# task writes it out, so bursts of indexing requests coalesce into one write.
+RAG_SAVE_DELAY_SECONDS = 2.0
+_dirty = asyncio.Event()
+_flusher_task: Optional[asyncio.Task] = None
+
+def mark_rag_index_dirty():
+    """Mark the RAG index as changed so the background flusher saves it"""
+    _dirty.set()
+
+def flush_rag_index():
+    """Save the RAG index now if it has unsaved changes"""
+    if _dirty.is_set():
+        _dirty.clear()
+        if not save_rag_index():
+            # Keep the changes pending so a later flush retries them
+            _dirty.set()
+
+async def _flusher():
+    """Save the RAG index at most once per RAG_SAVE_DELAY_SECONDS while it changes"""
+    while True:
+        await _dirty.wait()
+        await asyncio.sleep(RAG_SAVE_DELAY_SECONDS)
+        _dirty.clear()
+        # Snapshot on the loop so handlers can't change the index mid-save, then
+        # serialize and write in a thread so requests aren't stalled by the index size
+        snapshot = _rag_index_snapshot()
+        if not await asyncio.to_thread(write_rag_index, snapshot):
+            _dirty.set()
+
+def start_rag_flusher():
+    """Start the background index saver (called from the app lifespan)"""
+    global _flusher_task
+    if _flusher_task is None:
+        _flusher_task = asyncio.create_task(_flusher())
+
+def stop_rag_flusher():
+    """Stop the background index saver and save any pending changes"""
+    global _flusher_task
+    if _flusher_task is not None:
+        _flusher_task.cancel()
+        _flusher_task = None
+    flush_rag_index()
+
+# Final save for shutdowns that skip the ASGI lifespan
+atexit.register(flush_rag_index)
+
 def load_exported_dataset(file_id: str) -> Dict[str, Any]:
     """Load an exported dataset from the exports directory"""
     exports_dir = get_exports_dir()
@@ -661,27 +814,40 @@ def load_exported_dataset(file_id: str) -> Dict[str, Any]:
 
     raise HTTPException(status_code=404, detail=f"Exported dataset {file_id} not found")
 
+def count_exported_rows(file_path: str, format: str) -> int:
+    """Count the data rows of an exported dataset without loading them"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        if format == "csv":
+            reader = csv.reader(f)
+            next(reader, None)  # Skip header
+            return sum(1 for row in reader if row)
+        return sum(1 for line in f if line.strip())
+
 def get_available_exported_datasets() -> List[Dict[str, Any]]:
     """Get list of all available exported datasets"""
     exports_dir = get_exports_dir()
     datasets = []
 
-    if not os.path.exists(exports_dir):
+    try:
+        with os.scandir(exports_dir) as it:
+            entries = [
+                entry for entry in it
+                if entry.name.endswith(('_export.csv', '_export.jsonl')) and entry.is_file()
+            ]
+    except FileNotFoundError:
         return datasets
 
-    for filename in os.listdir(exports_dir):
-        if filename.endswith('_export.csv') or filename.endswith('_export.jsonl'):
-            file_id = filename.replace('_export.csv', '').replace('_export.jsonl', '')
-            try:
-                dataset_info = load_exported_dataset(file_id)
-                datasets.append({
-                    "id": dataset_info["id"],
-                    "name": dataset_info["name"],
-                    "format": dataset_info["format"],
-                    "row_count": dataset_info["row_count"],
-                    "filename": filename
-                })
-            except Exception as e:
-                print(f"Error loading dataset info for {file_id}: {e}")
+    for entry in entries:
+        file_id, _, extension = entry.name.rpartition('_export.')
+        try:
+            datasets.append({
+                "id": file_id,
+                "name": f"{file_id}_export",
+                "format": extension,
+                "row_count": count_exported_rows(entry.path, extension),
+                "filename": entry.name
+            })
+        except Exception as e:
+            print(f"Error loading dataset info for {file_id}: {e}")
 
     return datasets
\ No newline at end of file
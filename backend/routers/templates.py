@@ -1,20 +1,52 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
-import json
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError
+from typing import Dict, Any, List, Literal, Optional, get_args
+from typing_extensions import Annotated, NotRequired, TypedDict
+from collections import Counter
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import orjson
 import os
+import threading
 import uuid
 from datetime import datetime
 
+try:
+    from ..utils.responses import DataForgeJSONResponse
+except ImportError:
+    from utils.responses import DataForgeJSONResponse
+
 router = APIRouter()
 
+_REQUIRED_KEYS = ('id', 'name', 'fields')
+FieldType = Literal['string', 'integer', 'float', 'boolean', 'categorical', 'list', 'object']
+TaskType = Literal['classification', 'ner', 'qa', 'summarization', 'sentiment', 'custom']
+_VALID_TYPES = frozenset(get_args(FieldType))
+_VALID_TASK_TYPES = frozenset(get_args(TaskType))
+
+class FieldSpec(BaseModel):
+    # Optional keys (description, options, optional, ...) are kept as extras so
+    # templates serialize exactly as they were defined
+    model_config = ConfigDict(frozen=True, extra='allow')
+
+    name: str
+    type: str
+
+class AnnotationSchema(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='allow')
+
+    type: str
+
 class DatasetTemplate(BaseModel):
     id: str
     name: str
     description: str
     task_type: str  # "classification", "ner", "sentiment", "qa", "custom"
-    fields: List[Dict[str, Any]]
-    annotation_schema: Dict[str, Any]
+    fields: List[FieldSpec]
+    annotation_schema: AnnotationSchema
     export_format: str  # "csv", "jsonl", "huggingface"
     created_at: Optional[str] = None
     usage_count: Optional[int] = None
@@ -22,360 +54,504 @@ class DatasetTemplate(BaseModel):
 class CustomDatasetRequest(BaseModel):
     name: str
     description: str
-    fields: List[Dict[str, Any]]
-    annotation_schema: Dict[str, Any]
+    fields: List[FieldSpec]
+    annotation_schema: AnnotationSchema
 
-# Get storage directory
+# Get storage directory. The lookups are cached (and the templates directory
+# created once); call .cache_clear() after changing the variable at runtime.
+@functools.lru_cache(maxsize=1)
 def get_storage_dir():
     return os.environ.get("DATAFORGE_STORAGE_DIR", "./storage")
 
+@functools.lru_cache(maxsize=1)
 def get_templates_dir():
     """Get directory for storing custom templates"""
     storage_dir = get_storage_dir()
-    templates_dir = f"{storage_dir}/templates"
+    templates_dir = os.path.join(storage_dir, "templates")
     os.makedirs(templates_dir, exist_ok=True)
     return templates_dir
 
-def load_custom_templates() -> Dict[str, DatasetTemplate]:
+# Template files are only written by save_custom_template from validated models,
+# so reloading them can skip pydantic validation
+TRUST_STORED_TEMPLATES = True
+
+# Parsed custom templates, valid while the templates directory mtime is unchanged.
+# Per-file entries let a rescan reparse only the files whose mtime changed.
+_custom_templates_lock = threading.Lock()
+TEMPLATE_IO_EXECUTOR = ThreadPoolExecutor(
+    max_workers=min(32, (os.cpu_count() or 1) * 4),
+    thread_name_prefix="template-io"
+)
+_custom_template_files: Dict[str, tuple] = {}  # filename -> (mtime_ns, DatasetTemplate or None)
+_custom_templates_cache: Dict[str, DatasetTemplate] = {}
+_custom_templates_cache_key: Optional[tuple] = None
+
+def update_custom_templates_cache(filename: str, template: Optional[DatasetTemplate] = None):
+    """Record a saved template file (or a removed one when template is None)"""
+    global _custom_templates_cache_key
+    templates_dir = get_templates_dir()
+    with _custom_templates_lock:
+        if template is None:
+            _custom_template_files.pop(filename, None)
+        else:
+            mtime_ns = os.stat(os.path.join(templates_dir, filename)).st_mtime_ns
+            _custom_template_files[filename] = (mtime_ns, template)
+        # The next load only restats the directory; unchanged files are not reparsed
+        _custom_templates_cache_key = None
+
+def parse_stored_template(raw: bytes) -> DatasetTemplate:
+    """Build a DatasetTemplate from the bytes of a template file"""
+    if TRUST_STORED_TEMPLATES:
+        template_data = orjson.loads(raw)
+        return DatasetTemplate.model_construct(**{
+            **template_data,
+            "fields": [FieldSpec.model_construct(**field) for field in template_data["fields"]],
+            "annotation_schema": AnnotationSchema.model_construct(**template_data["annotation_schema"])
+        })
+    # Parse and validate in one pass inside pydantic-core
+    return DatasetTemplate.model_validate_json(raw)
+
+def _load_custom_templates_sync() -> Dict[str, DatasetTemplate]:
     """Load custom templates from storage"""
+    global _custom_templates_cache, _custom_templates_cache_key
     templates_dir = get_templates_dir()
-    custom_templates = {}
-    
-    for filename in os.listdir(templates_dir):
-        if filename.endswith('.json'):
+    with _custom_templates_lock:
+        cache_key = (templates_dir, os.stat(templates_dir).st_mtime_ns)
+        if cache_key == _custom_templates_cache_key:
+            return _custom_templates_cache
+        
+        with os.scandir(templates_dir) as it:
+            entries = [
+                (entry, entry.stat().st_mtime_ns) for entry in it
+                if entry.name.endswith('.json') and entry.is_file()
+            ]
+        stale = [
+            entry for entry, mtime_ns in entries
+            if _custom_template_files.get(entry.name, (None,))[0] != mtime_ns
+        ]
+        
+        def read_template_file(entry: os.DirEntry):
             try:
-                with open(os.path.join(templates_dir, filename), 'r', encoding='utf-8') as f:
-                    template_data = json.load(f)
-                    template = DatasetTemplate(**template_data)
-                    custom_templates[template.id] = template
+                with open(entry.path, 'rb') as f:
+                    return entry.name, f.read(), None
             except Exception as e:
-                print(f"Error loading template {filename}: {e}")
-    
-    return custom_templates
+                return entry.name, None, e
+        
+        # Overlap file reads across the pool, then parse on this thread
+        loaded = list(TEMPLATE_IO_EXECUTOR.map(read_template_file, stale))
+        
+        mtimes = {entry.name: mtime_ns for entry, mtime_ns in entries}
+        for filename, raw, error in loaded:
+            # Unreadable files are remembered as None so they are not retried until modified
+            template = None
+            if error is None:
+                try:
+                    template = parse_stored_template(raw)
+                except Exception as e:
+                    error = e
+            if error is not None:
+                print(f"Error loading template {filename}: {error}")
+            _custom_template_files[filename] = (mtimes[filename], template)
+        
+        # Evict files that no longer exist
+        for filename in _custom_template_files.keys() - mtimes.keys():
+            del _custom_template_files[filename]
+        
+        custom_templates = {}
+        for entry, _ in entries:
+            template = _custom_template_files[entry.name][1]
+            if template is not None:
+                custom_templates[template.id] = template
+        
+        _custom_templates_cache = custom_templates
+        _custom_templates_cache_key = cache_key
+        return custom_templates
+
+async def load_custom_templates() -> Dict[str, DatasetTemplate]:
+    """Load custom templates without blocking the event loop"""
+    return await asyncio.to_thread(_load_custom_templates_sync)
+
+def get_custom_template_path(template_id: str) -> str:
+    """Path of the file a custom template is stored in"""
+    return os.path.join(get_templates_dir(), f"{template_id}.json")
 
 def save_custom_template(template: DatasetTemplate):
     """Save a custom template to storage"""
-    templates_dir = get_templates_dir()
-    filename = f"{template.id}.json"
-    filepath = os.path.join(templates_dir, filename)
+    filepath = get_custom_template_path(template.id)
+    filename = os.path.basename(filepath)
     
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(template.dict(), f, indent=2, ensure_ascii=False)
-
-# Predefined dataset templates
-PREDEFINED_TEMPLATES = {
-    "sentiment_analysis": DatasetTemplate(
-        id="sentiment_analysis",
-        name="Sentiment Analysis",
-        description="Text classification for positive/negative/neutral sentiment",
-        task_type="classification",
-        fields=[
+    # Write to a temp file and swap it in so readers never see a partial template.
+    # The temp name is unique per writer so concurrent saves don't share it; no
+    # fsync, the template store is best-effort across crashes.
+    tmp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(template.model_dump(), option=orjson.OPT_INDENT_2))
+    except BaseException:
+        # Don't leave a partial temp file behind in the templates directory
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    os.replace(tmp_path, filepath)
+    update_custom_templates_cache(filename, template)
+
+# Predefined dataset templates, kept as plain dicts since they are only ever served as JSON
+PREDEFINED_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    "sentiment_analysis": {
+        "id": "sentiment_analysis",
+        "name": "Sentiment Analysis",
+        "description": "Text classification for positive/negative/neutral sentiment",
+        "task_type": "classification",
+        "fields": [
             {"name": "text", "type": "string", "description": "Input text"},
             {"name": "label", "type": "categorical", "options": ["positive", "negative", "neutral"]},
             {"name": "confidence", "type": "float", "optional": True}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "single_choice",
             "options": ["positive", "negative", "neutral"],
             "instructions": "Select the overall sentiment of the text"
         },
-        export_format="jsonl",
-        created_at="2024-01-15T10:00:00Z",
-        usage_count=245
-    ),
+        "export_format": "jsonl",
+        "created_at": "2024-01-15T10:00:00Z",
+        "usage_count": 245
+    },
     
-    "text_classification": DatasetTemplate(
-        id="text_classification",
-        name="Text Classification",
-        description="General text classification with custom categories",
-        task_type="classification",
-        fields=[
+    "text_classification": {
+        "id": "text_classification",
+        "name": "Text Classification",
+        "description": "General text classification with custom categories",
+        "task_type": "classification",
+        "fields": [
             {"name": "text", "type": "string", "description": "Input text"},
             {"name": "category", "type": "categorical", "options": []},
             {"name": "subcategory", "type": "string", "optional": True}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "single_choice",
             "options": [],
             "allow_custom": True,
             "instructions": "Classify the text into appropriate category"
         },
-        export_format="jsonl",
-        created_at="2024-01-10T14:30:00Z",
-        usage_count=189
-    ),
+        "export_format": "jsonl",
+        "created_at": "2024-01-10T14:30:00Z",
+        "usage_count": 189
+    },
     
-    "named_entity_recognition": DatasetTemplate(
-        id="named_entity_recognition",
-        name="Named Entity Recognition (NER)",
-        description="Token-level classification for entity extraction",
-        task_type="ner",
-        fields=[
+    "named_entity_recognition": {
+        "id": "named_entity_recognition",
+        "name": "Named Entity Recognition (NER)",
+        "description": "Token-level classification for entity extraction",
+        "task_type": "ner",
+        "fields": [
             {"name": "text", "type": "string", "description": "Input text"},
             {"name": "entities", "type": "list", "description": "List of entities with positions"},
             {"name": "tokens", "type": "list", "description": "Tokenized text"},
             {"name": "labels", "type": "list", "description": "BIO labels for each token"}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "entity_selection",
             "entity_types": ["PERSON", "ORG", "LOC", "MISC"],
             "labeling_scheme": "BIO",
             "instructions": "Highlight entities in the text and assign appropriate labels"
         },
-        export_format="jsonl",
-        created_at="2024-01-20T09:15:00Z",
-        usage_count=156
-    ),
+        "export_format": "jsonl",
+        "created_at": "2024-01-20T09:15:00Z",
+        "usage_count": 156
+    },
     
-    "question_answering": DatasetTemplate(
-        id="question_answering",
-        name="Question Answering",
-        description="Reading comprehension and question answering dataset",
-        task_type="qa",
-        fields=[
+    "question_answering": {
+        "id": "question_answering",
+        "name": "Question Answering",
+        "description": "Reading comprehension and question answering dataset",
+        "task_type": "qa",
+        "fields": [
             {"name": "context", "type": "string", "description": "Source text/paragraph"},
             {"name": "question", "type": "string", "description": "Question about the context"},
             {"name": "answer", "type": "string", "description": "Answer text"},
             {"name": "answer_start", "type": "integer", "description": "Character position where answer starts"}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "span_selection",
             "allow_no_answer": True,
             "instructions": "Select the text span that answers the question"
         },
-        export_format="jsonl",
-        created_at="2024-01-25T16:45:00Z",
-        usage_count=98
-    ),
+        "export_format": "jsonl",
+        "created_at": "2024-01-25T16:45:00Z",
+        "usage_count": 98
+    },
     
-    "summarization": DatasetTemplate(
-        id="summarization",
-        name="Text Summarization",
-        description="Abstractive or extractive text summarization",
-        task_type="summarization",
-        fields=[
+    "summarization": {
+        "id": "summarization",
+        "name": "Text Summarization",
+        "description": "Abstractive or extractive text summarization",
+        "task_type": "summarization",
+        "fields": [
             {"name": "document", "type": "string", "description": "Full document text"},
             {"name": "summary", "type": "string", "description": "Summary text"},
             {"name": "summary_type", "type": "categorical", "options": ["abstractive", "extractive"]}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "text_generation",
             "max_length": 500,
             "instructions": "Write a concise summary of the main points"
         },
-        export_format="jsonl",
-        created_at="2024-02-01T11:20:00Z",
-        usage_count=134
-    ),
-
-    "text_generation": DatasetTemplate(
-        id="text_generation",
-        name="Text Generation",
-        description="Creative text generation and completion tasks",
-        task_type="generation",
-        fields=[
+        "export_format": "jsonl",
+        "created_at": "2024-02-01T11:20:00Z",
+        "usage_count": 134
+    },
+
+    "text_generation": {
+        "id": "text_generation",
+        "name": "Text Generation",
+        "description": "Creative text generation and completion tasks",
+        "task_type": "generation",
+        "fields": [
             {"name": "prompt", "type": "string", "description": "Input prompt or context"},
             {"name": "completion", "type": "string", "description": "Generated text completion"},
             {"name": "max_length", "type": "integer", "optional": True, "description": "Maximum generation length"},
             {"name": "temperature", "type": "float", "optional": True, "description": "Generation temperature"}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "text_generation",
             "max_length": 1000,
             "instructions": "Complete the text naturally and coherently"
         },
-        export_format="jsonl",
-        created_at="2024-02-05T13:30:00Z",
-        usage_count=87
-    ),
-
-    "machine_translation": DatasetTemplate(
-        id="machine_translation",
-        name="Machine Translation",
-        description="Translate text between different languages",
-        task_type="translation",
-        fields=[
+        "export_format": "jsonl",
+        "created_at": "2024-02-05T13:30:00Z",
+        "usage_count": 87
+    },
+
+    "machine_translation": {
+        "id": "machine_translation",
+        "name": "Machine Translation",
+        "description": "Translate text between different languages",
+        "task_type": "translation",
+        "fields": [
             {"name": "source_text", "type": "string", "description": "Text in source language"},
             {"name": "target_text", "type": "string", "description": "Translated text in target language"},
             {"name": "source_lang", "type": "string", "description": "Source language code (e.g., 'en', 'es', 'fr')"},
             {"name": "target_lang", "type": "string", "description": "Target language code (e.g., 'en', 'es', 'fr')"}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "text_generation",
             "instructions": "Provide an accurate translation that preserves meaning and context"
         },
-        export_format="jsonl",
-        created_at="2024-02-10T15:45:00Z",
-        usage_count=76
-    ),
-
-    "part_of_speech_tagging": DatasetTemplate(
-        id="part_of_speech_tagging",
-        name="Part-of-Speech Tagging",
-        description="Token-level classification for grammatical categories",
-        task_type="pos_tagging",
-        fields=[
+        "export_format": "jsonl",
+        "created_at": "2024-02-10T15:45:00Z",
+        "usage_count": 76
+    },
+
+    "part_of_speech_tagging": {
+        "id": "part_of_speech_tagging",
+        "name": "Part-of-Speech Tagging",
+        "description": "Token-level classification for grammatical categories",
+        "task_type": "pos_tagging",
+        "fields": [
             {"name": "text", "type": "string", "description": "Input text"},
             {"name": "tokens", "type": "list", "description": "Tokenized text"},
             {"name": "pos_tags", "type": "list", "description": "POS tags for each token"},
             {"name": "lemmas", "type": "list", "optional": True, "description": "Lemmatized forms"}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "token_classification",
             "tag_set": ["NOUN", "VERB", "ADJ", "ADV", "PRON", "DET", "ADP", "CONJ", "PRT", "NUM", "X"],
             "instructions": "Assign the correct part-of-speech tag to each token"
         },
-        export_format="jsonl",
-        created_at="2024-02-15T09:20:00Z",
-        usage_count=65
-    ),
-
-    "text_similarity": DatasetTemplate(
-        id="text_similarity",
-        name="Text Similarity",
-        description="Determine semantic similarity between text pairs",
-        task_type="similarity",
-        fields=[
+        "export_format": "jsonl",
+        "created_at": "2024-02-15T09:20:00Z",
+        "usage_count": 65
+    },
+
+    "text_similarity": {
+        "id": "text_similarity",
+        "name": "Text Similarity",
+        "description": "Determine semantic similarity between text pairs",
+        "task_type": "similarity",
+        "fields": [
             {"name": "text1", "type": "string", "description": "First text"},
             {"name": "text2", "type": "string", "description": "Second text"},
             {"name": "similarity_score", "type": "float", "description": "Similarity score (0-1)"},
             {"name": "label", "type": "categorical", "options": ["similar", "dissimilar"], "optional": True}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "similarity_rating",
             "scale": [0, 1],
             "instructions": "Rate how similar these two texts are semantically"
         },
-        export_format="jsonl",
-        created_at="2024-02-20T11:10:00Z",
-        usage_count=52
-    ),
-
-    "dialogue_system": DatasetTemplate(
-        id="dialogue_system",
-        name="Dialogue System",
-        description="Conversational AI and chatbot training data",
-        task_type="dialogue",
-        fields=[
+        "export_format": "jsonl",
+        "created_at": "2024-02-20T11:10:00Z",
+        "usage_count": 52
+    },
+
+    "dialogue_system": {
+        "id": "dialogue_system",
+        "name": "Dialogue System",
+        "description": "Conversational AI and chatbot training data",
+        "task_type": "dialogue",
+        "fields": [
             {"name": "context", "type": "list", "description": "Previous conversation turns"},
             {"name": "user_input", "type": "string", "description": "User message"},
             {"name": "response", "type": "string", "description": "System response"},
             {"name": "intent", "type": "string", "optional": True, "description": "Detected user intent"}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "text_generation",
             "instructions": "Provide a natural, helpful response to the user's message"
         },
-        export_format="jsonl",
-        created_at="2024-02-25T14:00:00Z",
-        usage_count=43
-    ),
-
-    "code_generation": DatasetTemplate(
-        id="code_generation",
-        name="Code Generation",
-        description="Generate code from natural language descriptions",
-        task_type="code_generation",
-        fields=[
+        "export_format": "jsonl",
+        "created_at": "2024-02-25T14:00:00Z",
+        "usage_count": 43
+    },
+
+    "code_generation": {
+        "id": "code_generation",
+        "name": "Code Generation",
+        "description": "Generate code from natural language descriptions",
+        "task_type": "code_generation",
+        "fields": [
             {"name": "description", "type": "string", "description": "Natural language description of the task"},
             {"name": "code", "type": "string", "description": "Generated code"},
             {"name": "language", "type": "categorical", "options": ["python", "javascript", "java", "cpp", "go", "rust", "other"]},
             {"name": "framework", "type": "string", "optional": True, "description": "Specific framework or library"}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "text_generation",
             "instructions": "Write clean, functional code that solves the described task"
         },
-        export_format="jsonl",
-        created_at="2024-03-01T10:30:00Z",
-        usage_count=91
-    ),
-
-    "text_to_sql": DatasetTemplate(
-        id="text_to_sql",
-        name="Text-to-SQL",
-        description="Convert natural language queries to SQL statements",
-        task_type="text_to_sql",
-        fields=[
+        "export_format": "jsonl",
+        "created_at": "2024-03-01T10:30:00Z",
+        "usage_count": 91
+    },
+
+    "text_to_sql": {
+        "id": "text_to_sql",
+        "name": "Text-to-SQL",
+        "description": "Convert natural language queries to SQL statements",
+        "task_type": "text_to_sql",
+        "fields": [
             {"name": "question", "type": "string", "description": "Natural language question"},
             {"name": "sql_query", "type": "string", "description": "Generated SQL query"},
             {"name": "database_schema", "type": "string", "description": "Database schema information"},
             {"name": "query_type", "type": "categorical", "options": ["SELECT", "INSERT", "UPDATE", "DELETE", "CREATE", "DROP"]}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "text_generation",
             "instructions": "Generate a correct SQL query that answers the question using the provided schema"
         },
-        export_format="jsonl",
-        created_at="2024-03-05T12:15:00Z",
-        usage_count=67
-    ),
-
-    "emotion_recognition": DatasetTemplate(
-        id="emotion_recognition",
-        name="Emotion Recognition",
-        description="Classify emotions expressed in text",
-        task_type="emotion_classification",
-        fields=[
+        "export_format": "jsonl",
+        "created_at": "2024-03-05T12:15:00Z",
+        "usage_count": 67
+    },
+
+    "emotion_recognition": {
+        "id": "emotion_recognition",
+        "name": "Emotion Recognition",
+        "description": "Classify emotions expressed in text",
+        "task_type": "emotion_classification",
+        "fields": [
             {"name": "text", "type": "string", "description": "Input text"},
             {"name": "emotion", "type": "categorical", "options": ["joy", "sadness", "anger", "fear", "surprise", "disgust", "neutral"]},
             {"name": "intensity", "type": "float", "optional": True, "description": "Emotion intensity (0-1)"},
             {"name": "confidence", "type": "float", "optional": True, "description": "Classification confidence"}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "single_choice",
             "options": ["joy", "sadness", "anger", "fear", "surprise", "disgust", "neutral"],
             "instructions": "Select the primary emotion expressed in the text"
         },
-        export_format="jsonl",
-        created_at="2024-03-10T14:45:00Z",
-        usage_count=58
-    ),
-
-    "language_identification": DatasetTemplate(
-        id="language_identification",
-        name="Language Identification",
-        description="Detect the language of given text",
-        task_type="language_id",
-        fields=[
+        "export_format": "jsonl",
+        "created_at": "2024-03-10T14:45:00Z",
+        "usage_count": 58
+    },
+
+    "language_identification": {
+        "id": "language_identification",
+        "name": "Language Identification",
+        "description": "Detect the language of given text",
+        "task_type": "language_id",
+        "fields": [
             {"name": "text", "type": "string", "description": "Input text"},
             {"name": "language", "type": "categorical", "options": ["en", "es", "fr", "de", "it", "pt", "ru", "zh", "ja", "ko", "ar", "hi", "other"]},
             {"name": "confidence", "type": "float", "optional": True, "description": "Detection confidence score"},
             {"name": "script", "type": "string", "optional": True, "description": "Writing script (Latin, Cyrillic, Arabic, etc.)"}
         ],
-        annotation_schema={
+        "annotation_schema": {
             "type": "single_choice",
             "options": ["en", "es", "fr", "de", "it", "pt", "ru", "zh", "ja", "ko", "ar", "hi", "other"],
             "allow_custom": True,
             "instructions": "Identify the primary language of the text"
         },
-        export_format="jsonl",
-        created_at="2024-03-15T16:20:00Z",
-        usage_count=72
-    )
+        "export_format": "jsonl",
+        "created_at": "2024-03-15T16:20:00Z",
+        "usage_count": 72
+    }
+}
+
+# Predefined template payloads only change when the server is redeployed
+STATIC_CACHE_CONTROL = "public, max-age=3600"
+
+class CachedJSON:
+    """JSON response body serialized once, with its ETag"""
+
+    def __init__(self, content: Any):
+        self.body = orjson.dumps(content)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()}"'
+
+    def response(self, request: Request) -> Response:
+        """Full body, or 304 when the client already holds this ETag"""
+        headers = {"ETag": self.etag, "Cache-Control": STATIC_CACHE_CONTROL}
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            if self.etag in tags or "*" in tags:
+                return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+# Predefined templates never change, so serialize them once instead of per request
+PREDEFINED_TEMPLATES_JSON = CachedJSON({
+    "templates": list(PREDEFINED_TEMPLATES.values()),
+    "count": len(PREDEFINED_TEMPLATES)
+})
+PREDEFINED_TEMPLATE_JSON = {
+    template_id: CachedJSON(template) for template_id, template in PREDEFINED_TEMPLATES.items()
 }
 
+# Listing metadata only; fields and annotation schema stay on the detail endpoints
+TEMPLATE_SUMMARY_KEYS = ('id', 'name', 'description', 'task_type', 'export_format', 'usage_count')
+PREDEFINED_TEMPLATES_SUMMARY_JSON = CachedJSON({
+    "templates": [
+        {key: template[key] for key in TEMPLATE_SUMMARY_KEYS} for template in PREDEFINED_TEMPLATES.values()
+    ],
+    "count": len(PREDEFINED_TEMPLATES)
+})
+
 @router.get("/templates")
-async def get_predefined_templates():
-    """Get all predefined dataset templates"""
-    return {
-        "templates": list(PREDEFINED_TEMPLATES.values()),
-        "count": len(PREDEFINED_TEMPLATES)
-    }
+async def get_predefined_templates(request: Request, summary: bool = False):
+    """Get all predefined dataset templates (metadata only with summary=true)"""
+    if summary:
+        return PREDEFINED_TEMPLATES_SUMMARY_JSON.response(request)
+    return PREDEFINED_TEMPLATES_JSON.response(request)
 
 @router.get("/templates/custom")
-async def get_custom_templates():
-    """Get all custom templates"""
-    custom_templates = load_custom_templates()
+async def get_custom_templates(summary: bool = False):
+    """Get all custom templates (metadata only with summary=true)"""
+    custom_templates = await load_custom_templates()
+    if summary:
+        templates = [template.model_dump(include=set(TEMPLATE_SUMMARY_KEYS)) for template in custom_templates.values()]
+    else:
+        templates = list(custom_templates.values())
     return {
-        "templates": list(custom_templates.values()),
+        "templates": templates,
         "count": len(custom_templates)
     }
 
 @router.get("/templates/custom/{template_id}")
 async def get_custom_template(template_id: str):
     """Get a specific custom template by ID"""
-    custom_templates = load_custom_templates()
+    custom_templates = await load_custom_templates()
     if template_id not in custom_templates:
         raise HTTPException(status_code=404, detail="Custom template not found")
     
@@ -384,8 +560,7 @@ async def get_custom_template(template_id: str):
 @router.put("/templates/custom/{template_id}")
 async def update_custom_template(template_id: str, request: CustomDatasetRequest):
     """Update a custom template"""
-    custom_templates = load_custom_templates()
-    if template_id not in custom_templates:
+    if not os.path.isfile(get_custom_template_path(template_id)):
         raise HTTPException(status_code=404, detail="Custom template not found")
     
     # Update the template
@@ -400,7 +575,7 @@ async def update_custom_template(template_id: str, request: CustomDatasetRequest
     )
     
     # Save the updated template
-    save_custom_template(updated_template)
+    await asyncio.to_thread(save_custom_template, updated_template)
     
     return {
         "message": "Custom template updated successfully",
@@ -410,17 +585,12 @@ async def update_custom_template(template_id: str, request: CustomDatasetRequest
 @router.delete("/templates/custom/{template_id}")
 async def delete_custom_template(template_id: str):
     """Delete a custom template"""
-    custom_templates = load_custom_templates()
-    if template_id not in custom_templates:
+    filepath = get_custom_template_path(template_id)
+    try:
+        await asyncio.to_thread(os.remove, filepath)
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Custom template not found")
-    
-    # Delete the template file
-    templates_dir = get_templates_dir()
-    filename = f"{template_id}.json"
-    filepath = os.path.join(templates_dir, filename)
-    
-    if os.path.exists(filepath):
-        os.remove(filepath)
+    update_custom_templates_cache(os.path.basename(filepath))
     
     return {
         "message": "Custom template deleted successfully",
@@ -428,46 +598,39 @@ async def delete_custom_template(template_id: str):
     }
 
 @router.get("/templates/{template_id}")
-async def get_template(template_id: str):
+async def get_template(template_id: str, request: Request):
     """Get a specific template by ID"""
-    if template_id not in PREDEFINED_TEMPLATES:
+    cached = PREDEFINED_TEMPLATE_JSON.get(template_id)
+    if cached is None:
         raise HTTPException(status_code=404, detail="Template not found")
     
-    return PREDEFINED_TEMPLATES[template_id]
+    return cached.response(request)
 
 @router.post("/templates/{template_id}/apply")
 async def apply_template_to_file(template_id: str, file_id: str):
     """Apply a dataset template to parsed file content"""
-    if template_id not in PREDEFINED_TEMPLATES:
+    template = PREDEFINED_TEMPLATES.get(template_id)
+    if template is None:
         raise HTTPException(status_code=404, detail="Template not found")
     
-    template = PREDEFINED_TEMPLATES[template_id]
-    
     # This would integrate with the parsing system
     # For now, return template structure
-    return {
-        "message": f"Template {template.name} applied to file {file_id}",
+    return DataForgeJSONResponse({
+        "message": f"Template {template['name']} applied to file {file_id}",
         "template": template,
         "file_id": file_id,
         "annotation_url": f"/annotate/{file_id}?template={template_id}"
-    }
+    })
 
-@router.get("/templates/{template_id}/export-sample")
-async def get_export_sample(template_id: str):
-    """Get a sample export format for the template"""
-    if template_id not in PREDEFINED_TEMPLATES:
-        raise HTTPException(status_code=404, detail="Template not found")
-    
-    template = PREDEFINED_TEMPLATES[template_id]
-    
-    # Generate sample data based on template
-    if template.task_type == "classification":
-        sample = {
+def build_export_sample(template_id: str, template: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate sample data based on template"""
+    if template["task_type"] == "classification":
+        return {
             "text": "This is a sample text for classification.",
             "label": "positive" if template_id == "sentiment_analysis" else "category_1"
         }
-    elif template.task_type == "ner":
-        sample = {
+    elif template["task_type"] == "ner":
+        return {
             "text": "John Smith works at Microsoft in Seattle.",
             "entities": [
                 {"text": "John Smith", "label": "PERSON", "start": 0, "end": 10},
@@ -475,73 +638,164 @@ async def get_export_sample(template_id: str):
                 {"text": "Seattle", "label": "LOC", "start": 33, "end": 40}
             ]
         }
-    elif template.task_type == "qa":
-        sample = {
+    elif template["task_type"] == "qa":
+        return {
             "context": "The quick brown fox jumps over the lazy dog.",
             "question": "What color is the fox?",
             "answer": "brown",
             "answer_start": 10
         }
     else:
-        sample = {field["name"]: f"sample_{field['name']}" for field in template.fields}
-    
-    return {
+        return {field["name"]: f"sample_{field['name']}" for field in template["fields"]}
+
+# Predefined templates are immutable, so their export samples are serialized once
+EXPORT_SAMPLE_JSON = {
+    template_id: CachedJSON({
         "template": template,
-        "sample_data": sample,
-        "format": template.export_format
-    }
+        "sample_data": build_export_sample(template_id, template),
+        "format": template["export_format"]
+    })
+    for template_id, template in PREDEFINED_TEMPLATES.items()
+}
+
+@router.get("/templates/{template_id}/export-sample")
+async def get_export_sample(template_id: str, request: Request):
+    """Get a sample export format for the template"""
+    cached = EXPORT_SAMPLE_JSON.get(template_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    
+    return cached.response(request)
+
+class _TemplateFieldStructure(TypedDict):
+    name: Any
+    type: Any
+
+class _TemplateStructure(TypedDict):
+    id: Any
+    name: Any
+    fields: List[_TemplateFieldStructure]
+    annotation_schema: NotRequired[Dict[str, Any]]
+
+# Structural checks for validate_template, compiled once by pydantic-core
+TEMPLATE_STRUCTURE_VALIDATOR = TypeAdapter(_TemplateStructure)
+
+def check_template_structure(template: Dict[str, Any]) -> Dict[tuple, str]:
+    """Run the prebuilt structure validator and map error locations to messages"""
+    try:
+        TEMPLATE_STRUCTURE_VALIDATOR.validate_python(template)
+        return {}
+    except ValidationError as e:
+        problems = {}
+        for error in e.errors():
+            loc = error['loc']
+            if len(loc) == 1 and error['type'] == 'missing':
+                problems[loc] = f"Missing required field: '{loc[0]}'"
+            elif loc == ('fields',):
+                problems[loc] = "'fields' must be a list"
+            elif loc[0] == 'fields' and len(loc) == 2:
+                problems[loc] = f"Field {loc[1]} must be an object"
+            elif loc[0] == 'fields' and loc[2] == 'name':
+                problems[loc] = f"Field {loc[1]} missing 'name'"
+            elif loc[0] == 'fields':
+                problems[loc] = f"Field '{template['fields'][loc[1]].get('name', loc[1])}' missing 'type'"
+            elif loc == ('annotation_schema',):
+                problems[loc] = "'annotation_schema' must be an object"
+        return problems
+
+class TemplateFieldInput(TypedDict):
+    name: str
+    type: FieldType
+
+class AnnotationSchemaInput(TypedDict):
+    type: Any
+    instructions: Any
+
+class TemplateInput(TypedDict):
+    """Shape of a template that passes validation without errors or warnings"""
+    id: Any
+    name: Any
+    fields: Annotated[List[TemplateFieldInput], Field(min_length=1)]
+    annotation_schema: AnnotationSchemaInput
+    task_type: NotRequired[TaskType]
+
+TEMPLATE_INPUT_VALIDATOR = TypeAdapter(TemplateInput)
+
+def is_clean_template(template: Dict[str, Any]) -> bool:
+    """Check for templates that would produce no errors and no warnings"""
+    try:
+        TEMPLATE_INPUT_VALIDATOR.validate_python(template)
+    except ValidationError:
+        return False
+    
+    # Rules that span fields stay in Python
+    fields = template['fields']
+    if len({field['name'] for field in fields}) != len(fields):
+        return False
+    return all(field['type'] != 'categorical' or 'options' in field for field in fields)
+
+# validate_template response for clean templates, minus the trailing template_id value
+_VALID_RESPONSE_PREFIX = orjson.dumps({
+    "valid": True,
+    "errors": [],
+    "warnings": [],
+    "message": "Template is valid",
+    "template_id": None
+})[:-len(b'null}')]
 
 @router.post("/templates/validate")
 async def validate_template(template: Dict[str, Any]):
     """Validate a template structure"""
-    errors = []
-    warnings = []
+    if is_clean_template(template):
+        body = _VALID_RESPONSE_PREFIX + orjson.dumps(template['id']) + b'}'
+        return Response(content=body, media_type="application/json")
     
-    # Check required fields
-    required_keys = ['id', 'name', 'fields']
-    for key in required_keys:
-        if key not in template:
-            errors.append(f"Missing required field: '{key}'")
+    problems = check_template_structure(template)
+    errors = [problems[(key,)] for key in _REQUIRED_KEYS if (key,) in problems]
+    warnings = []
     
     # Validate fields array
     if 'fields' in template:
-        if not isinstance(template['fields'], list):
-            errors.append("'fields' must be a list")
+        if ('fields',) in problems:
+            pass
         elif len(template['fields']) == 0:
             warnings.append("Template has no fields defined")
         else:
-            field_names = set()
+            field_names = []
             for i, field in enumerate(template['fields']):
                 # Check field structure
-                if not isinstance(field, dict):
-                    errors.append(f"Field {i} must be an object")
+                if ('fields', i) in problems:
+                    errors.append(problems[('fields', i)])
                     continue
+                name = field.get('name')
+                field_type = field.get('type')
+                if 'name' in field:
+                    field_names.append(field['name'])
                 
                 # Check field name
-                if 'name' not in field:
-                    errors.append(f"Field {i} missing 'name'")
-                elif field['name'] in field_names:
-                    errors.append(f"Duplicate field name: '{field['name']}'")
-                else:
-                    field_names.add(field['name'])
+                if ('fields', i, 'name') in problems:
+                    errors.append(problems[('fields', i, 'name')])
                 
                 # Check field type
-                if 'type' not in field:
-                    errors.append(f"Field '{field.get('name', i)}' missing 'type'")
-                else:
-                    valid_types = ['string', 'integer', 'float', 'boolean', 'categorical', 'list', 'object']
-                    if field['type'] not in valid_types:
-                        warnings.append(f"Field '{field.get('name')}' has non-standard type: '{field['type']}'")
+                if ('fields', i, 'type') in problems:
+                    errors.append(problems[('fields', i, 'type')])
+                elif not isinstance(field_type, str) or field_type not in _VALID_TYPES:
+                    warnings.append(f"Field '{name}' has non-standard type: '{field_type}'")
                 
                 # Validate categorical options
-                if field.get('type') == 'categorical' and 'options' not in field:
-                    warnings.append(f"Categorical field '{field.get('name')}' should have 'options'")
+                if field_type == 'categorical' and 'options' not in field:
+                    warnings.append(f"Categorical field '{name}' should have 'options'")
+            
+            # Check for duplicate field names
+            for name, count in Counter(field_names).items():
+                if count > 1:
+                    errors.append(f"Duplicate field name: '{name}'")
     
     # Validate annotation schema
     if 'annotation_schema' in template:
         schema = template['annotation_schema']
-        if not isinstance(schema, dict):
-            errors.append("'annotation_schema' must be an object")
+        if ('annotation_schema',) in problems:
+            errors.append(problems[('annotation_schema',)])
         else:
             if 'type' not in schema:
                 warnings.append("Annotation schema missing 'type'")
@@ -552,8 +806,7 @@ async def validate_template(template: Dict[str, Any]):
     
     # Check task type
     if 'task_type' in template:
-        valid_task_types = ['classification', 'ner', 'qa', 'summarization', 'sentiment', 'custom']
-        if template['task_type'] not in valid_task_types:
+        if not isinstance(template['task_type'], str) or template['task_type'] not in _VALID_TASK_TYPES:
             warnings.append(f"Unusual task_type: '{template['task_type']}'")
     
     return {
@@ -562,4 +815,4 @@ async def validate_template(template: Dict[str, Any]):
         "warnings": warnings,
         "message": "Template is valid" if len(errors) == 0 else f"Found {len(errors)} error(s)",
         "template_id": template.get('id', 'unknown')
-    }
+    }
\ No newline at end of file
@@ -1,11 +1,25 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
+from fastapi import APIRouter, File, Request, UploadFile, HTTPException
 from fastapi.responses import JSONResponse
+import asyncio
+import functools
 import os
+import shutil
+import threading
 import uuid
-import magic
-from typing import List
+from typing import BinaryIO, List
 
-# Get upload directory from environment variable or use default
+# One libmagic handle for the process; its cookie is not thread-safe, so calls are serialized
+try:
+    import magic
+    MIME_DETECTOR = magic.Magic(mime=True)
+except Exception as e:
+    MIME_DETECTOR = None
+    print(f"Warning: MIME type detection unavailable, using extension checks only: {e}")
+MIME_DETECTOR_LOCK = threading.Lock()
+
+# Get upload directory from environment variable or use default.
+# Cached; call .cache_clear() after changing the variable at runtime.
+@functools.lru_cache(maxsize=1)
 def get_upload_dir():
     return os.environ.get("DATAFORGE_UPLOADS_DIR", "../storage/uploads")
 
@@ -21,6 +35,11 @@ ALLOWED_MIME_TYPES = {
     'text/csv'
 }
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+UPLOAD_COPY_CHUNK_SIZE = 1024 * 1024
+MULTIPART_OVERHEAD = 64 * 1024  # Allowance for boundaries and part headers in Content-Length
+MIME_SNIFF_BYTES = 4096  # libmagic only needs the leading bytes
+PDF_SIGNATURE = b'%PDF-'  # readers accept it anywhere in the first 1024 bytes
+ZIP_SIGNATURE = b'PK\x03\x04'  # EPUB is a ZIP container
 
 def validate_file(file: UploadFile) -> tuple[bool, str]:
     """Validate uploaded file type and size"""
@@ -39,10 +58,43 @@ def validate_file(file: UploadFile) -> tuple[bool, str]:
     
     return True, "Valid file"
 
+def has_expected_signature(file_ext: str, head: bytes) -> bool:
+    """Check that a file header carries the magic bytes its extension implies"""
+    if file_ext == '.pdf':
+        return PDF_SIGNATURE in head[:1024]
+    if file_ext == '.epub':
+        return head.startswith(ZIP_SIGNATURE)
+    return True
+
+def detect_mime_type(head: bytes) -> str:
+    """Detect the MIME type of a file header with the shared libmagic handle"""
+    with MIME_DETECTOR_LOCK:
+        return MIME_DETECTOR.from_buffer(head)
+
+def write_upload(source: BinaryIO, file_path: str, limit: int) -> int:
+    """Stream an upload to disk, stopping once more than limit bytes are written"""
+    written = 0
+    with open(file_path, "wb") as f:
+        while chunk := source.read(UPLOAD_COPY_CHUNK_SIZE):
+            f.write(chunk)
+            written += len(chunk)
+            if written > limit:
+                break
+    return written
+
 @router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(request: Request, file: UploadFile = File(...)):
     """Upload a PDF or EPUB file and save it to storage"""
     try:
+        # Reject oversized requests from the declared length before validating or writing anything.
+        # Starlette has already spooled the multipart body by now, so this only saves the later work.
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > MAX_FILE_SIZE + MULTIPART_OVERHEAD:
+            raise HTTPException(
+                status_code=413,
+                detail=f"File size too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB."
+            )
+        
         # Validate file
         is_valid, message = validate_file(file)
         if not is_valid:
@@ -59,38 +111,47 @@ async def upload_file(file: UploadFile = File(...)):
         os.makedirs(upload_dir, exist_ok=True)
         file_path = os.path.join(upload_dir, unique_filename)
         
-        # Read and validate file content
-        content = await file.read()
-        
-        # Additional MIME type validation using python-magic
-        try:
-            mime_type = magic.from_buffer(content, mime=True)
-            
-            # Special handling for EPUB files (they can have various MIME types)
-            if file_ext == '.epub':
-                # For EPUB, accept common MIME types or skip validation
-                epub_mime_types = {'application/epub+zip', 'application/zip', 'application/octet-stream'}
-                if mime_type not in epub_mime_types:
-                    print(f"Warning: EPUB file has unexpected MIME type: {mime_type}, but proceeding...")
-            elif mime_type not in ALLOWED_MIME_TYPES:
+        # Check the file header before anything is written to disk.
+        # CSV is plain text with no magic signature, so its extension is trusted.
+        if file_ext != '.csv':
+            head = await file.read(MIME_SNIFF_BYTES)
+            await file.seek(0)
+            if not has_expected_signature(file_ext, head):
                 raise HTTPException(
-                    status_code=400, 
-                    detail=f"Invalid file type detected: {mime_type}. Only PDF and EPUB files are supported."
+                    status_code=400,
+                    detail="File content does not match its extension. Only PDF and EPUB files are supported."
                 )
-        except Exception as e:
-            # If magic fails, continue with extension-based validation
-            print(f"MIME type detection failed: {e}")
         
-        # Check actual file size
-        if len(content) > MAX_FILE_SIZE:
+        # Additional MIME type validation using python-magic on the same header
+        if MIME_DETECTOR is not None and file_ext != '.csv':
+            try:
+                mime_type = await asyncio.to_thread(detect_mime_type, head)
+                
+                # Special handling for EPUB files (they can have various MIME types)
+                if file_ext == '.epub':
+                    # For EPUB, accept common MIME types or skip validation
+                    epub_mime_types = {'application/epub+zip', 'application/zip', 'application/octet-stream'}
+                    if mime_type not in epub_mime_types:
+                        print(f"Warning: EPUB file has unexpected MIME type: {mime_type}, but proceeding...")
+                elif mime_type not in ALLOWED_MIME_TYPES:
+                    raise HTTPException(
+                        status_code=400, 
+                        detail=f"Invalid file type detected: {mime_type}. Only PDF and EPUB files are supported."
+                    )
+            except Exception as e:
+                # If magic fails, continue with extension-based validation
+                print(f"MIME type detection failed: {e}")
+        
+        # Stream the spooled upload to disk off the event loop
+        file_size = await asyncio.to_thread(write_upload, file.file, file_path, MAX_FILE_SIZE)
+        
+        # Check actual file size (covers uploads sent without a Content-Length)
+        if file_size > MAX_FILE_SIZE:
+            await asyncio.to_thread(os.remove, file_path)
             raise HTTPException(
-                status_code=400, 
+                status_code=413,
                 detail=f"File size too large. Maximum size is {MAX_FILE_SIZE // (1024*1024)}MB."
             )
-        
-        # Save file
-        with open(file_path, "wb") as f:
-            f.write(content)
 
         # If the uploaded file is a CSV, also copy it into the exports directory
         # using the expected exported dataset filename so the RAG indexing
@@ -101,8 +162,8 @@ async def upload_file(file: UploadFile = File(...)):
                 os.makedirs(exports_dir, exist_ok=True)
                 export_filename = f"{file_id}_export.csv"
                 export_path = os.path.join(exports_dir, export_filename)
-                with open(export_path, 'wb') as ef:
-                    ef.write(content)
+                # A real copy, not a hardlink: exports are rewritten in place
+                await asyncio.to_thread(shutil.copyfile, file_path, export_path)
         except Exception as e:
             # Non-fatal: warn and continue
             print(f"Warning: could not copy uploaded CSV to exports dir: {e}")
@@ -114,7 +175,7 @@ async def upload_file(file: UploadFile = File(...)):
                 "file_id": file_id,
                 "filename": file.filename,
                 "file_path": unique_filename,
-                "file_size": len(content),
+                "file_size": file_size,
                 "file_type": file_ext[1:]  # Remove the dot
             }
         )
@@ -133,17 +194,17 @@ async def list_uploads():
             return {"files": []}
         
         files = []
-        for filename in os.listdir(upload_dir):
-            file_path = os.path.join(upload_dir, filename)
-            if os.path.isfile(file_path):
-                stat = os.stat(file_path)
-                file_id = os.path.splitext(filename)[0]
-                file_ext = os.path.splitext(filename)[1][1:]  # Remove dot
+        with os.scandir(upload_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                file_id, file_ext = os.path.splitext(entry.name)
                 
                 files.append({
                     "file_id": file_id,
-                    "filename": filename,
-                    "file_type": file_ext,
+                    "filename": entry.name,
+                    "file_type": file_ext[1:],  # Remove dot
                     "file_size": stat.st_size,
                     "upload_time": stat.st_mtime
                 })
@@ -159,12 +220,14 @@ async def delete_upload(file_id: str):
     try:
         upload_dir = get_upload_dir()
         
-        # Find file with matching ID
-        for filename in os.listdir(upload_dir):
-            if filename.startswith(file_id):
-                file_path = os.path.join(upload_dir, filename)
-                os.remove(file_path)
-                return {"message": f"File {filename} deleted successfully"}
+        # Uploads are saved as {file_id}{ext}, so probe those names directly
+        for file_ext in ALLOWED_EXTENSIONS:
+            filename = f"{file_id}{file_ext}"
+            try:
+                os.remove(os.path.join(upload_dir, filename))
+            except FileNotFoundError:
+                continue
+            return {"message": f"File {filename} deleted successfully"}
         
         raise HTTPException(status_code=404, detail="File not found")
         
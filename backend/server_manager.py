@@ -10,17 +10,288 @@ Usage:
     python backend/server_manager.py status  - Check server status
 """
 
+import ctypes
+import functools
+import io
 import os
 import sys
+import select
 import signal
+import socket
+import struct
 import time
 import subprocess
-import psutil
 import json
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Set, Tuple
 import argparse
 
+# psutil is imported where it is used, so `logs` and `config` don't pay for it
+if TYPE_CHECKING:
+    import psutil
+
+# orjson comes with the backend requirements; the manager still works without it
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+# Linux sock_diag netlink constants (linux/netlink.h, linux/sock_diag.h, linux/inet_diag.h)
+NETLINK_INET_DIAG = 4
+SOCK_DIAG_BY_FAMILY = 20
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+TCP_LISTEN = 10
+NLMSG_HEADER = struct.Struct("=IHHII")
+INET_DIAG_REQ_V2 = struct.Struct("=BBBBI48x")  # family, protocol, ext, pad, states, zeroed sockid
+# In struct inet_diag_msg, idiag_sport (network order) is at offset 4 and idiag_inode at 68
+INET_DIAG_SPORT = struct.Struct(">H")
+INET_DIAG_INODE = struct.Struct("=I")
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x2
+IN_DELETE_SELF = 0x400
+IN_MOVE_SELF = 0x800
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct("=iIII")  # wd, mask, cookie, len (name follows)
+
+# How long a listener snapshot is reused before the kernel is asked again
+LISTEN_CACHE_TTL = 0.25
+
+# Block size for reading the log backwards in tail_lines()
+TAIL_BLOCK_SIZE = 8192
+
+# How long start() waits for the server to accept connections before trusting it is up
+STARTUP_TIMEOUT = 3.0
+
+
+def tcp_listeners() -> Optional[Dict[int, Set[int]]]:
+    """Map listening TCP ports to socket inodes with one sock_diag dump per address family.
+
+    This is the query `ss -ltn` makes; it avoids walking every process's connections.
+    Returns None where NETLINK_INET_DIAG is unavailable, so callers can fall back to psutil.
+    """
+    if not hasattr(socket, "AF_NETLINK"):
+        return None
+    
+    listeners: Dict[int, Set[int]] = {}
+    try:
+        with socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_INET_DIAG) as sock:
+            for family in (socket.AF_INET, socket.AF_INET6):
+                request = INET_DIAG_REQ_V2.pack(family, socket.IPPROTO_TCP, 0, 0, 1 << TCP_LISTEN)
+                header = NLMSG_HEADER.pack(
+                    NLMSG_HEADER.size + len(request), SOCK_DIAG_BY_FAMILY,
+                    NLM_F_REQUEST | NLM_F_DUMP, family, 0
+                )
+                sock.send(header + request)
+                
+                done = False
+                while not done:
+                    data = sock.recv(65536)
+                    offset = 0
+                    while offset + NLMSG_HEADER.size <= len(data):
+                        length, msg_type = NLMSG_HEADER.unpack_from(data, offset)[:2]
+                        if msg_type == NLMSG_DONE or length < NLMSG_HEADER.size:
+                            done = True
+                            break
+                        if msg_type == NLMSG_ERROR:
+                            # IPv6 may be disabled; an IPv4 failure means we can't trust the result
+                            if family == socket.AF_INET:
+                                return None
+                            done = True
+                            break
+                        body = offset + NLMSG_HEADER.size
+                        port = INET_DIAG_SPORT.unpack_from(data, body + 4)[0]
+                        inode = INET_DIAG_INODE.unpack_from(data, body + 68)[0]
+                        listeners.setdefault(port, set()).add(inode)
+                        offset += (length + 3) & ~3
+    except OSError:
+        return None
+    
+    return listeners
+
+
+def proc_net_tcp_listeners() -> Optional[Dict[int, Set[int]]]:
+    """Map listening TCP ports to socket inodes by parsing /proc/net/tcp and tcp6.
+
+    Used when sock_diag netlink is blocked (e.g. by a container seccomp profile).
+    Returns None when procfs is not available either.
+    """
+    listeners: Dict[int, Set[int]] = {}
+    found = False
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table, 'r') as f:
+                next(f, None)  # column header
+                for row in f:
+                    # sl local_address rem_address st tx:rx tr:when retrnsmt uid timeout inode
+                    fields = row.split()
+                    if len(fields) > 9 and fields[3] == '0A':  # TCP_LISTEN
+                        port = int(fields[1].rsplit(':', 1)[1], 16)
+                        listeners.setdefault(port, set()).add(int(fields[9]))
+            found = True
+        except OSError:
+            continue
+    return listeners if found else None
+
+
+def pids_for_socket_inodes(inodes: Set[int]) -> Set[int]:
+    """Find the processes holding any of the given socket inodes via /proc/<pid>/fd."""
+    targets = {f"socket:[{inode}]" for inode in inodes}
+    pids = set()
+    with os.scandir("/proc") as entries:
+        for entry in entries:
+            if not entry.name.isdigit():
+                continue
+            fd_dir = f"/proc/{entry.name}/fd"
+            try:
+                fds = os.listdir(fd_dir)
+            except OSError:
+                continue
+            for fd in fds:
+                try:
+                    if os.readlink(f"{fd_dir}/{fd}") in targets:
+                        pids.add(int(entry.name))
+                        break
+                except OSError:
+                    continue
+    return pids
+
+
+def pid_exists(pid: int) -> bool:
+    """Probe a PID with signal 0, a single kill(2) call (psutil on Windows, where os.kill terminates)."""
+    if pid <= 0:
+        # 0 and negative values address process groups, not a process
+        return False
+    if os.name == 'nt':
+        import psutil
+        
+        return psutil.pid_exists(pid)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists but belongs to another user
+        return True
+    return True
+
+
+def read_cmdline(pid: int) -> Optional[List[str]]:
+    """Return the argv of pid from /proc/<pid>/cmdline, or via psutil where there is no procfs."""
+    try:
+        with open(f"/proc/{pid}/cmdline", 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        if os.path.isdir("/proc/self"):
+            return None
+        import psutil
+        
+        try:
+            return psutil.Process(pid).cmdline()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return None
+    except OSError:
+        return None
+    # NUL-separated with a trailing NUL
+    return [os.fsdecode(arg) for arg in data.rstrip(b'\0').split(b'\0')]
+
+
+def is_server_cmdline(args: List[str]) -> bool:
+    """Match `python -m uvicorn backend.main:app ...` as well as the `uvicorn backend.main:app` script."""
+    if 'backend.main:app' not in args:
+        return False
+    app_index = args.index('backend.main:app')
+    return any(os.path.basename(arg) == 'uvicorn' for arg in args[:app_index])
+
+
+def pidfd_alive(fd: int) -> bool:
+    """A pidfd becomes readable once its process exits, so a zero-timeout poll tells liveness."""
+    poller = select.poll()
+    poller.register(fd, select.POLLIN)
+    return not poller.poll(0)
+
+
+def inotify_init() -> Optional[int]:
+    """Create an inotify fd through libc, or return None where inotify is unavailable."""
+    try:
+        fd = ctypes.CDLL(None, use_errno=True).inotify_init1(IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    return fd if fd >= 0 else None
+
+
+def inotify_add_watch(fd: int, path: Path, mask: int) -> bool:
+    """Watch path on an inotify fd; returns False if the watch could not be added."""
+    libc = ctypes.CDLL(None, use_errno=True)
+    return libc.inotify_add_watch(fd, os.fsencode(path), mask) >= 0
+
+
+def read_inotify_mask(fd: int) -> int:
+    """Block for the next batch of inotify events and return their combined mask."""
+    data = os.read(fd, 4096)
+    mask = 0
+    offset = 0
+    while offset + INOTIFY_EVENT.size <= len(data):
+        _, event_mask, _, name_len = INOTIFY_EVENT.unpack_from(data, offset)
+        mask |= event_mask
+        offset += INOTIFY_EVENT.size + name_len
+    return mask
+
+
+def tail_lines(path: Path, count: int, end: Optional[int] = None) -> List[str]:
+    """Return the last count lines of a file (up to byte offset end) by reading blocks backwards."""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END) if end is None else end
+        if count <= 0:
+            # Same as readlines()[-count:], which keeps everything for 0
+            f.seek(0)
+            data = f.read(pos)
+            return io.StringIO(data.decode('utf-8', errors='replace'), newline=None).readlines()[-count:]
+        
+        blocks = []
+        newlines = 0
+        # count lines end in count newlines, plus one more marking where the first begins
+        while pos > 0 and newlines <= count:
+            size = min(TAIL_BLOCK_SIZE, pos)
+            pos -= size
+            f.seek(pos)
+            block = f.read(size)
+            newlines += block.count(b'\n')
+            blocks.append(block)
+    
+    data = b''.join(reversed(blocks))
+    # StringIO(newline=None) splits lines the way text-mode readlines() does
+    return io.StringIO(data.decode('utf-8', errors='replace'), newline=None).readlines()[-count:]
+
+
+@functools.lru_cache(maxsize=4)
+def read_config_file(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """Parse a config file. Keyed on mtime so edits are picked up; call .cache_clear() to force a re-read."""
+    with open(path, 'rb') as f:
+        return json_loads(f.read())
+
+
+class SpawnedProcess:
+    """Minimal Popen stand-in (pid and poll) for a child started with os.posix_spawn."""
+    
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.returncode: Optional[int] = None
+    
+    def poll(self) -> Optional[int]:
+        if self.returncode is None:
+            try:
+                pid, status = os.waitpid(self.pid, os.WNOHANG)
+            except ChildProcessError:
+                return None
+            if pid:
+                self.returncode = os.waitstatus_to_exitcode(status)
+        return self.returncode
+
 
 class ServerManager:
     """Manages the DataForge Reader backend server with systemd-like commands."""
@@ -31,6 +302,14 @@ class ServerManager:
         self.pid_file = self.project_root / ".backend.pid"
         self.log_file = self.project_root / "backend.log"
         self.config_file = self.project_root / ".backend_config.json"
+        self.status_file = self.project_root / ".backend_status.json"
+        
+        # (monotonic timestamp, listening-port map); see get_listeners()
+        self._listen_cache: Optional[tuple] = None
+        # (pid, pidfd) of the verified server process, where os.pidfd_open is available
+        self._pidfd: Optional[Tuple[int, int]] = None
+        # psutil.Process for the server PID, built once and reused by stop() and status()
+        self._proc: Optional["psutil.Process"] = None
         
         # Default configuration
         self.default_config = {
@@ -38,18 +317,25 @@ class ServerManager:
             "port": 8000,
             "workers": 1,
             "reload": True,
-            "log_level": "info"
+            "log_level": "info",
+            "http": "httptools",
+            "loop": "uvloop",
+            "timeout_graceful_shutdown": 5,
+            "limit_concurrency": None
         }
         self.config = self.load_config()
     
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file or use defaults."""
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r') as f:
-                    return {**self.default_config, **json.load(f)}
-            except Exception as e:
-                print(f"⚠️  Warning: Failed to load config: {e}")
+        try:
+            mtime_ns = self.config_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            return self.default_config
+        
+        try:
+            return {**self.default_config, **read_config_file(str(self.config_file), mtime_ns)}
+        except Exception as e:
+            print(f"⚠️  Warning: Failed to load config: {e}")
         return self.default_config
     
     def save_config(self):
@@ -62,28 +348,50 @@ class ServerManager:
     
     def get_pid(self) -> Optional[int]:
         """Read PID from file if it exists."""
-        if not self.pid_file.exists():
-            return None
-        
         try:
-            with open(self.pid_file, 'r') as f:
-                pid = int(f.read().strip())
-                # Verify process still exists
-                if psutil.pid_exists(pid):
-                    try:
-                        proc = psutil.Process(pid)
-                        # Check if it's actually our uvicorn process
-                        cmdline = ' '.join(proc.cmdline())
-                        if 'uvicorn' in cmdline and 'backend.main:app' in cmdline:
-                            return pid
-                    except (psutil.NoSuchProcess, psutil.AccessDenied):
-                        pass
-                
-                # PID file exists but process doesn't, clean it up
-                self.pid_file.unlink()
-                return None
+            # int() accepts the bytes directly, surrounding whitespace included
+            pid = int(self.pid_file.read_bytes())
         except (ValueError, FileNotFoundError):
             return None
+        
+        # Already verified in this session: a pidfd poll is enough
+        if self._pidfd is not None and self._pidfd[0] == pid:
+            if pidfd_alive(self._pidfd[1]):
+                return pid
+            self.close_pidfd()
+        # Verify process still exists and is actually our uvicorn process
+        elif pid_exists(pid):
+            args = read_cmdline(pid)
+            if args is not None and is_server_cmdline(args):
+                self.open_pidfd(pid)
+                return pid
+        
+        # PID file exists but process doesn't, clean it up
+        self.pid_file.unlink(missing_ok=True)
+        return None
+    
+    def open_pidfd(self, pid: int):
+        """Hold a pidfd for the server so later liveness checks skip /proc parsing."""
+        self.close_pidfd()
+        if hasattr(os, 'pidfd_open'):
+            try:
+                self._pidfd = (pid, os.pidfd_open(pid, 0))
+            except OSError:
+                pass
+    
+    def close_pidfd(self):
+        """Release the cached pidfd, if any."""
+        if self._pidfd is not None:
+            os.close(self._pidfd[1])
+            self._pidfd = None
+    
+    def get_process(self, pid: int) -> "psutil.Process":
+        """Return the psutil.Process for pid, building it only once per session."""
+        if self._proc is None or self._proc.pid != pid:
+            import psutil
+            
+            self._proc = psutil.Process(pid)
+        return self._proc
     
     def save_pid(self, pid: int):
         """Save PID to file."""
@@ -92,31 +400,71 @@ class ServerManager:
     
     def remove_pid_file(self):
         """Remove PID file."""
+        self.close_pidfd()
+        self._proc = None
         if self.pid_file.exists():
             self.pid_file.unlink()
     
-    def kill_process_on_port(self, port: int) -> bool:
-        """Kill any process using the specified port."""
-        killed = False
-        print(f"🔍 Checking for processes on port {port}...")
+    def get_listeners(self) -> Optional[Dict[int, Set[int]]]:
+        """Return the listening-port map, reusing a snapshot younger than LISTEN_CACHE_TTL."""
+        now = time.monotonic()
+        if self._listen_cache is not None and now - self._listen_cache[0] < LISTEN_CACHE_TTL:
+            return self._listen_cache[1]
+        listeners = tcp_listeners()
+        if listeners is None:
+            listeners = proc_net_tcp_listeners()
+        self._listen_cache = (now, listeners)
+        return listeners
+    
+    def clear_listen_cache(self):
+        """Drop the listener snapshot after killing or stopping a process."""
+        self._listen_cache = None
+    
+    def find_listening_pids(self, port: int) -> Set[int]:
+        """Find the PIDs of processes listening on the specified port."""
+        listeners = self.get_listeners()
+        if listeners is not None:
+            inodes = listeners.get(port)
+            return pids_for_socket_inodes(inodes) if inodes else set()
+        
+        # No sock_diag or procfs (non-Linux): ask every process for its connections
+        import psutil
         
+        pids = set()
         for proc in psutil.process_iter(['pid', 'name']):
             try:
                 # Use net_connections() instead of deprecated connections()
                 for conn in proc.net_connections():
                     if conn.laddr.port == port and conn.status == 'LISTEN':
-                        print(f"⚠️  Found process {proc.pid} ({proc.name()}) using port {port}")
-                        print(f"🔫 Killing process {proc.pid}...")
-                        proc.kill()
-                        proc.wait(timeout=5)
-                        killed = True
-                        print(f"✅ Process {proc.pid} killed successfully")
+                        pids.add(proc.pid)
+                        break
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return pids
+    
+    def kill_process_on_port(self, port: int) -> bool:
+        """Kill any process using the specified port."""
+        import psutil
+        
+        killed = False
+        print(f"🔍 Checking for processes on port {port}...")
+        
+        for pid in self.find_listening_pids(port):
+            try:
+                proc = psutil.Process(pid)
+                print(f"⚠️  Found process {proc.pid} ({proc.name()}) using port {port}")
+                print(f"🔫 Killing process {proc.pid}...")
+                proc.kill()
+                proc.wait(timeout=5)
+                killed = True
+                print(f"✅ Process {proc.pid} killed successfully")
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.TimeoutExpired):
                 continue
             except Exception as e:
                 print(f"⚠️  Error checking process: {e}")
                 continue
         
+        self.clear_listen_cache()
         if killed:
             # Wait a bit for the port to be released
             time.sleep(1)
@@ -126,6 +474,12 @@ class ServerManager:
     
     def is_port_in_use(self, port: int) -> bool:
         """Check if a port is currently in use."""
+        listeners = self.get_listeners()
+        if listeners is not None:
+            return port in listeners
+        
+        import psutil
+        
         for proc in psutil.process_iter(['pid', 'name']):
             try:
                 # Use net_connections() instead of deprecated connections()
@@ -144,14 +498,14 @@ class ServerManager:
             print("⚠️  Warning: requirements.txt not found")
             return True
         
-        try:
-            import uvicorn
-            import fastapi
-            return True
-        except ImportError as e:
-            print(f"❌ Missing dependencies: {e}")
+        # find_spec only asks the import system whether the module exists; the server process
+        # imports them, this one doesn't need to
+        missing = [name for name in ("uvicorn", "fastapi") if find_spec(name) is None]
+        if missing:
+            print(f"❌ Missing dependencies: {', '.join(missing)}")
             print(f"💡 Run: pip install -r {requirements_file}")
             return False
+        return True
     
     def start(self, force: bool = False) -> bool:
         """Start the backend server."""
@@ -198,29 +552,61 @@ class ServerManager:
         if self.config['workers'] > 1:
             cmd.extend(["--workers", str(self.config['workers'])])
         
+        # Pin the protocol and event loop implementations; skip any that aren't installed
+        for option in ("http", "loop"):
+            implementation = self.config[option]
+            if implementation != "auto" and find_spec(implementation) is not None:
+                cmd.extend([f"--{option}", implementation])
+        
+        if self.config['timeout_graceful_shutdown'] is not None:
+            cmd.extend(["--timeout-graceful-shutdown", str(self.config['timeout_graceful_shutdown'])])
+        
+        if self.config['limit_concurrency']:
+            cmd.extend(["--limit-concurrency", str(self.config['limit_concurrency'])])
+        
         # Start process
         try:
-            # Open log file
-            log_file = open(self.log_file, 'a')
-            log_file.write(f"\n{'='*60}\n")
-            log_file.write(f"Server started at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            log_file.write(f"{'='*60}\n\n")
-            
-            process = subprocess.Popen(
-                cmd,
-                cwd=self.project_root,
-                stdout=log_file,
-                stderr=subprocess.STDOUT,
-                start_new_session=True
+            # Open log file append-only; the server's stdout/stderr are the only inherited copies
+            log_fd = os.open(
+                self.log_file,
+                os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_CLOEXEC', 0),
+                0o644
             )
+            try:
+                banner = (
+                    f"\n{'='*60}\n"
+                    f"Server started at {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    f"{'='*60}\n\n"
+                )
+                os.write(log_fd, banner.encode())
+                
+                if hasattr(os, 'posix_spawn') and Path.cwd().resolve() == self.project_root.resolve():
+                    # posix_spawn (vfork-style) skips copying this process; it has no chdir action,
+                    # so it is only used when we already run from the project root
+                    process = SpawnedProcess(os.posix_spawn(
+                        sys.executable, cmd, os.environ,
+                        file_actions=[
+                            (os.POSIX_SPAWN_DUP2, log_fd, 1),
+                            (os.POSIX_SPAWN_DUP2, log_fd, 2),
+                        ],
+                        setsid=True
+                    ))
+                else:
+                    process = subprocess.Popen(
+                        cmd,
+                        cwd=self.project_root,
+                        stdout=log_fd,
+                        stderr=subprocess.STDOUT,
+                        start_new_session=True
+                    )
+            finally:
+                os.close(log_fd)
             
             # Save PID
             self.save_pid(process.pid)
             
-            # Wait a moment and check if process started successfully
-            time.sleep(2)
-            
-            if process.poll() is not None:
+            # Wait until the server accepts connections or exits
+            if not self.wait_for_startup(process):
                 print(f"❌ Server failed to start! Check {self.log_file} for details")
                 self.remove_pid_file()
                 return False
@@ -237,17 +623,67 @@ class ServerManager:
             self.remove_pid_file()
             return False
     
-    def stop(self, timeout: int = 10) -> bool:
+    def wait_for_startup(self, process, timeout: float = STARTUP_TIMEOUT) -> bool:
+        """Probe the server port with backoff; returns False if the process exits first."""
+        host = {"0.0.0.0": "127.0.0.1", "::": "::1"}.get(self.config['host'], self.config['host'])
+        pidfd = None
+        if hasattr(os, 'pidfd_open'):
+            try:
+                pidfd = os.pidfd_open(process.pid, 0)
+            except OSError:
+                pass
+        
+        deadline = time.monotonic() + timeout
+        delay = 0.05
+        try:
+            while True:
+                try:
+                    with socket.create_connection((host, self.config['port']), timeout=delay):
+                        return process.poll() is None
+                except OSError:
+                    pass
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    # Still binding (slow imports); it is alive, which is what we checked before
+                    return process.poll() is None
+                
+                wait = min(delay, remaining)
+                if pidfd is not None:
+                    if select.select([pidfd], [], [], wait)[0]:
+                        process.poll()
+                        return False
+                else:
+                    time.sleep(wait)
+                    if process.poll() is not None:
+                        return False
+                delay = min(delay * 2, 0.4)
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
+    
+    def stop(self, timeout: Optional[int] = None) -> bool:
         """Stop the backend server."""
+        return self._stop(self.get_pid(), timeout)
+    
+    def _stop(self, pid: Optional[int], timeout: Optional[int] = None) -> bool:
+        """Stop the server process whose PID the caller already resolved with get_pid()."""
         print("🛑 Stopping DataForge Reader Backend Server...")
         
-        pid = self.get_pid()
+        if timeout is None:
+            # Outlast uvicorn's own graceful-shutdown window before escalating to SIGKILL
+            grace = self.config['timeout_graceful_shutdown']
+            timeout = grace + 2 if grace is not None else 10
+        
+        self.clear_listen_cache()
         if not pid:
             print("⚠️  Server is not running")
             return False
         
+        import psutil
+        
         try:
-            proc = psutil.Process(pid)
+            proc = self.get_process(pid)
             
             # Try graceful shutdown first
             print(f"📤 Sending SIGTERM to process {pid}...")
@@ -281,7 +717,7 @@ class ServerManager:
         # Stop if running
         pid = self.get_pid()
         if pid:
-            if not self.stop():
+            if not self._stop(pid):
                 print("❌ Failed to stop server, aborting restart")
                 return False
             time.sleep(1)
@@ -301,27 +737,28 @@ class ServerManager:
             print(f"Port {self.config['port']}: Available")
             return False
         
+        import psutil
+        
         try:
-            proc = psutil.Process(pid)
+            proc = self.get_process(pid)
             
-            # Get process info
-            create_time = time.strftime('%Y-%m-%d %H:%M:%S', 
-                                       time.localtime(proc.create_time()))
-            cpu_percent = proc.cpu_percent(interval=0.1)
-            memory_mb = proc.memory_info().rss / 1024 / 1024
-            
-            # Get listening ports
-            listening_ports = []
-            for conn in proc.net_connections():
-                if conn.status == 'LISTEN':
-                    listening_ports.append(conn.laddr.port)
+            # Get process info; oneshot() reads each /proc/<pid> file once for all of these
+            with proc.oneshot():
+                create_time = time.strftime('%Y-%m-%d %H:%M:%S', 
+                                           time.localtime(proc.create_time()))
+                cpu_percent = self.cpu_usage(proc)
+                memory_mb = proc.memory_info().rss / 1024 / 1024
+                
+                # Get listening ports
+                listening_ports = {conn.laddr.port for conn in proc.net_connections()
+                                   if conn.status == 'LISTEN'}
             
             print("Status: ✅ RUNNING")
             print(f"PID: {pid}")
             print(f"Started: {create_time}")
             print(f"CPU Usage: {cpu_percent:.1f}%")
             print(f"Memory Usage: {memory_mb:.1f} MB")
-            print(f"Listening Ports: {', '.join(map(str, set(listening_ports)))}")
+            print(f"Listening Ports: {', '.join(map(str, sorted(listening_ports)))}")
             print(f"API URL: http://{self.config['host']}:{self.config['port']}")
             print(f"API Docs: http://{self.config['host']}:{self.config['port']}/docs")
             print(f"Log File: {self.log_file}")
@@ -332,6 +769,30 @@ class ServerManager:
             print(f"Status: ⚠️  ERROR - Process exists but cannot access: {e}")
             return False
     
+    def cpu_usage(self, proc: "psutil.Process") -> float:
+        """CPU percent since the previous status call (or since process start), without blocking."""
+        times = proc.cpu_times()
+        cpu = times.user + times.system
+        now = time.time()
+        
+        since_cpu, since_wall = 0.0, proc.create_time()
+        try:
+            with open(self.status_file, 'r') as f:
+                previous = json.load(f)
+            if previous['pid'] == proc.pid and previous['wall'] < now:
+                since_cpu, since_wall = previous['cpu'], previous['wall']
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
+        try:
+            with open(self.status_file, 'w') as f:
+                json.dump({"pid": proc.pid, "cpu": cpu, "wall": now}, f)
+        except OSError:
+            pass
+        
+        elapsed = now - since_wall
+        return (cpu - since_cpu) / elapsed * 100 if elapsed > 0 else 0.0
+    
     def logs(self, lines: int = 50, follow: bool = False):
         """Display server logs."""
         if not self.log_file.exists():
@@ -342,21 +803,57 @@ class ServerManager:
             print(f"📝 Following logs from {self.log_file} (Ctrl+C to stop)...")
             print("=" * 60)
             try:
-                # Use tail -f to follow logs
-                subprocess.run(["tail", "-f", str(self.log_file)])
+                self.follow_logs()
             except KeyboardInterrupt:
                 print("\n👋 Stopped following logs")
         else:
             print(f"📝 Last {lines} lines from {self.log_file}:")
             print("=" * 60)
             try:
-                with open(self.log_file, 'r') as f:
-                    all_lines = f.readlines()
-                    for line in all_lines[-lines:]:
-                        print(line, end='')
+                for line in tail_lines(self.log_file, lines):
+                    print(line, end='')
             except Exception as e:
                 print(f"❌ Failed to read logs: {e}")
     
+    def follow_logs(self, initial_lines: int = 10):
+        """Print the log tail, then stream appended output as inotify reports changes."""
+        watch_mask = IN_MODIFY | IN_MOVE_SELF | IN_DELETE_SELF
+        inotify_fd = inotify_init()
+        if inotify_fd is None or not inotify_add_watch(inotify_fd, self.log_file, watch_mask):
+            if inotify_fd is not None:
+                os.close(inotify_fd)
+            # No inotify (non-Linux): use tail -f to follow logs
+            subprocess.run(["tail", "-f", str(self.log_file)])
+            return
+        
+        log = open(self.log_file, 'r', errors='replace')
+        try:
+            end = log.seek(0, os.SEEK_END)
+            for line in tail_lines(self.log_file, initial_lines, end):
+                print(line, end='')
+            sys.stdout.flush()
+            
+            while True:
+                mask = read_inotify_mask(inotify_fd)
+                # Truncated in place (copytruncate rotation): start over from the top
+                if log.tell() > os.fstat(log.fileno()).st_size:
+                    log.seek(0)
+                sys.stdout.write(log.read())
+                sys.stdout.flush()
+                
+                if mask & (IN_MOVE_SELF | IN_DELETE_SELF):
+                    # Rotated away: wait for the server to recreate the file, then follow it
+                    while not self.log_file.exists():
+                        time.sleep(0.2)
+                    log.close()
+                    log = open(self.log_file, 'r', errors='replace')
+                    inotify_add_watch(inotify_fd, self.log_file, watch_mask)
+                    sys.stdout.write(log.read())
+                    sys.stdout.flush()
+        finally:
+            log.close()
+            os.close(inotify_fd)
+    
     def configure(self, **kwargs):
         """Update server configuration."""
         updated = False
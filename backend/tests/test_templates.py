@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routers import templates
+
+
+def validate(fields):
+    template = {
+        "id": "t",
+        "name": "T",
+        "fields": fields,
+        "annotation_schema": {"type": "classification", "instructions": "Label it"},
+    }
+    return asyncio.run(templates.validate_template(template))
+
+
+def test_validate_reports_duplicate_null_field_names():
+    result = validate([{"name": None, "type": "string"}, {"name": None, "type": "string"}])
+    assert result["valid"] is False
+    assert result["errors"] == ["Duplicate field name: 'None'"]
+
+
+def test_validate_reports_missing_field_name_without_duplicate():
+    result = validate([{"type": "string"}, {"type": "string"}])
+    assert result["valid"] is False
+    assert result["errors"] == ["Field 0 missing 'name'", "Field 1 missing 'name'"]
+
+
+def test_save_custom_template_removes_temp_file_on_failure(tmp_path, monkeypatch):
+    monkeypatch.setattr(templates, "get_templates_dir", lambda: str(tmp_path))
+    template = templates.DatasetTemplate.model_validate(
+        {**templates.PREDEFINED_TEMPLATES["sentiment_analysis"], "id": "custom_test"}
+    )
+
+    def fail(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr(templates.orjson, "dumps", fail)
+    with pytest.raises(OSError):
+        templates.save_custom_template(template)
+    assert os.listdir(tmp_path) == []
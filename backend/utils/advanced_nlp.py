@@ -3,13 +3,20 @@ Advanced NLP Features for DataForge-Reader
 Enhanced text analysis with state-of-the-art NLP capabilities
 """
 
-from typing import List, Dict, Any, Optional, Tuple, Set
+from typing import List, Dict, Any, Optional, Tuple, Set, FrozenSet
+from dataclasses import dataclass
 import re
 from collections import Counter, defaultdict
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+import atexit
+import functools
 import math
+import os
+import threading
 import numpy as np
-from datetime import datetime, timedelta
-import json
+
+from .text_analytics import load_spacy_model, SPACY_BATCH_SIZE, SPACY_N_PROCESS
 
 try:
     import spacy
@@ -18,28 +25,197 @@ except ImportError:
     SPACY_AVAILABLE = False
     spacy = None
 
+# fastText language-id model (lid.176.ftz from https://fasttext.cc/docs/en/language-identification.html),
+# looked for in backend/models/ unless DATAFORGE_LID_MODEL points elsewhere
+LID_MODEL_PATH = os.environ.get(
+    "DATAFORGE_LID_MODEL",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "lid.176.ftz")
+)
+
+# Batches of at least PARALLEL_MIN_TEXTS texts run the pure-Python per-text analyses across
+# PARALLEL_WORKERS processes; smaller batches don't pay back the IPC cost
+PARALLEL_MIN_TEXTS = int(os.environ.get("DATAFORGE_PARALLEL_MIN_TEXTS", "32"))
+PARALLEL_WORKERS = int(os.environ.get("DATAFORGE_PARALLEL_WORKERS", str(max(1, (os.cpu_count() or 1) // 2))))
+
+@functools.lru_cache(maxsize=1)
+def _load_language_identifier():
+    """Load the fastText language-id model once (None if fasttext or the model file is missing)"""
+    try:
+        import fasttext
+        return fasttext.load_model(LID_MODEL_PATH)
+    except (ImportError, ValueError, OSError) as e:
+        print(f"Advanced Text Analyzer: Warning - language identification model not available: {e}")
+        return None
+
+# Patterns used by the analyzers, compiled once at import
+_WORD_RE = re.compile(r'\b\w+\b')
+_ALPHA_WORD_RE = re.compile(r'\b[a-zA-Z]{3,}\b')
+_SENTENCE_SPLIT_RE = re.compile(r'[.!?]+')
+_NUMBERED_TITLE_RE = re.compile(r'^\d+\.\s+')
+_SUBSECTION_TITLE_RE = re.compile(r'^\d+\.\d+\s+')
+_CAPITALIZED_LINE_RE = re.compile(r'^[A-Z][^.!?]*$')
+_NUMBERED_LINE_RE = re.compile(r'^\d+\.?\s+[A-Z]')
+_YEAR_RE = re.compile(r'\d{4}')
+_DAY_RE = re.compile(r'\d{1,2}')
+_VOWEL_GROUP_RE = re.compile(r'[aeiouy]+')
+
+# Lowercased context words that make an entity of a given label more credible
+_COHERENCE_INDICATORS = {
+    "PERSON": frozenset(ind.lower() for ind in ["Mr.", "Mrs.", "Dr.", "CEO", "President", "said", "stated"]),
+    "ORG": frozenset(ind.lower() for ind in ["Inc.", "Corp.", "LLC", "Ltd.", "Company", "announced"]),
+    "GPE": frozenset(ind.lower() for ind in ["in", "from", "to", "at", "located", "based"])
+}
+
+# Name titles checked by _infer_gender, matched as whole words
+_MALE_INDICATORS = frozenset({'mr.', 'mr', 'sir', 'king', 'prince', 'duke'})
+_FEMALE_INDICATORS = frozenset({'mrs.', 'mrs', 'ms.', 'ms', 'miss', 'queen', 'princess', 'duchess'})
+
+@functools.lru_cache(maxsize=None)
+def _explain_label(label: str) -> Optional[str]:
+    """spacy.explain for an entity label, looked up once per label"""
+    return spacy.explain(label) if spacy and hasattr(spacy, 'explain') else label
+
+@functools.lru_cache(maxsize=65536)
+def _count_syllables(word: str) -> int:
+    """Simple syllable counting, memoized across documents"""
+    word = word.lower()
+    if not word:
+        return 0
+    
+    # Each run of consecutive vowels is one syllable
+    syllable_count = len(_VOWEL_GROUP_RE.findall(word))
+    
+    # Handle silent e
+    if word.endswith('e') and syllable_count > 1:
+        syllable_count -= 1
+    
+    return max(1, syllable_count)
+
+@dataclass(frozen=True)
+class _TextFeatures:
+    """Lowercased text and its tokenizations, computed once and shared by the analyzers"""
+    lower: str
+    words: List[str]  # _WORD_RE tokens, in order
+    word_set: FrozenSet[str]
+    split_words: List[str]  # whitespace-separated tokens
+
+@dataclass(frozen=True)
+class _SimilarityProfile:
+    """Per-text inputs to text_similarity, built once and reused across pairs"""
+    word_set: FrozenSet[str]
+    keywords: Dict[str, float]  # keyword -> score
+    keyword_norm: float  # Euclidean norm of the keyword scores
+    entities: FrozenSet[str]  # lowercased entity texts
+
+# Analyzer owned by each worker process of batch_analyze_advanced. Sentiment and structure
+# only need the lexicons, so workers skip loading the spaCy pipeline
+_worker_analyzer = None
+
+def _init_worker():
+    global _worker_analyzer
+    _worker_analyzer = AdvancedTextAnalyzer(load_spacy=False)
+
+# Worker pool for batch_analyze_advanced, created on first use and reused across calls
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    """The shared worker pool, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=PARALLEL_WORKERS, initializer=_init_worker)
+        return _pool
+
+def _shutdown_pool():
+    """Stop the worker pool (a later batch creates a fresh one)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+atexit.register(_shutdown_pool)
+
+def _analyze_one(args: Tuple[str, bool, bool]) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Sentiment and structure of one text, run inside a worker process"""
+    text, include_sentiment, include_structure = args
+    return (_worker_analyzer.advanced_sentiment_analysis(text) if include_sentiment else None,
+            _worker_analyzer.document_structure_analysis(text) if include_structure else None)
+
 class AdvancedTextAnalyzer:
     """Advanced NLP text analysis with enhanced features"""
     
-    def __init__(self):
+    def __init__(self, load_spacy: bool = True):
         """
         Initialize the Advanced Text Analyzer with enhanced capabilities
+        
+        Args:
+            load_spacy: Load the spaCy pipeline (False gives the lexicon-based fallbacks only)
         """
-        # Initialize spaCy model
-        try:
-            import spacy
-            self.nlp = spacy.load("en_core_web_sm")
-            self.spacy_available = True
-            print("Advanced Text Analyzer: spaCy model loaded successfully")
-        except (OSError, ImportError) as e:
-            print(f"Advanced Text Analyzer: Warning - spaCy model not available: {e}")
-            self.nlp = None
-            self.spacy_available = False
+        # Initialize spaCy model: the same full pipeline as TextAnalyzer, loaded once per process.
+        # Every component is kept since the one cached Doc per text serves entities (ner),
+        # TextRank sentences (parser) and lemmas/stop words (tagger, lemmatizer)
+        self.nlp = None
+        self.spacy_available = False
+        if load_spacy:
+            try:
+                self.nlp = load_spacy_model("en_core_web_sm")
+                self.spacy_available = True
+                print("Advanced Text Analyzer: spaCy model loaded successfully")
+            except (OSError, ImportError) as e:
+                print(f"Advanced Text Analyzer: Warning - spaCy model not available: {e}")
+        
+        # Parsed Docs keyed by text, shared by every analysis that runs the pipeline
+        self._doc = functools.lru_cache(maxsize=32)(self._parse)
+        # Same idea for the plain-text tokenizations
+        self._features = functools.lru_cache(maxsize=32)(self._build_features)
+        # Keyword/entity profiles, so a text compared against many others is only analyzed once
+        self._similarity_profile = functools.lru_cache(maxsize=256)(self._build_similarity_profile)
         
         # Initialize advanced components
         self._init_enhanced_sentiment_lexicons()
         self._init_tfidf_vectorizer()
     
+    def _parse(self, text: str):
+        """Run the spaCy pipeline on text (use the cached self._doc instead)"""
+        return self.nlp(text)
+    
+    def _build_features(self, text: str) -> _TextFeatures:
+        """Lowercase and tokenize text (use the cached self._features instead)"""
+        lower = text.lower()
+        words = _WORD_RE.findall(lower)
+        return _TextFeatures(lower=lower, words=words, word_set=frozenset(words), split_words=lower.split())
+    
+    def _docs(self, texts: List[str], batch_size: int = SPACY_BATCH_SIZE, n_process: int = SPACY_N_PROCESS) -> List[Any]:
+        """Parse many texts with one batched nlp.pipe call (None per text without spaCy)"""
+        if not (self.spacy_available and self.nlp):
+            return [None] * len(texts)
+        return list(self.nlp.pipe(texts, batch_size=batch_size, n_process=n_process))
+    
+    def _build_similarity_profile(self, text: str) -> _SimilarityProfile:
+        """Words, keywords and entities of text (use the cached self._similarity_profile instead)"""
+        return self._make_similarity_profile(
+            text, self.advanced_keyword_extraction(text), self.enhanced_entity_recognition(text)
+        )
+    
+    def _make_similarity_profile(self, text: str, keywords: List[Dict[str, Any]],
+                                 entities: List[Dict[str, Any]]) -> _SimilarityProfile:
+        """Similarity profile from already extracted keywords (default top_n) and entities"""
+        keyword_scores = {kw["keyword"]: kw["score"] for kw in keywords}
+        return _SimilarityProfile(
+            word_set=self._features(text).word_set,
+            keywords=keyword_scores,
+            keyword_norm=float(np.linalg.norm(np.fromiter(keyword_scores.values(), dtype=np.float64, count=len(keyword_scores)))),
+            entities=frozenset(ent["text"].lower() for ent in entities)
+        )
+    
+    def invalidate_cache(self):
+        """Drop cached spaCy Docs, tokenizations and similarity profiles, e.g. between unrelated requests"""
+        self._doc.cache_clear()
+        self._features.cache_clear()
+        self._similarity_profile.cache_clear()
+    
     def detect_language(self, text: str) -> str:
         """
         Detect the language of the input text
@@ -50,26 +226,20 @@ class AdvancedTextAnalyzer:
         Returns:
             Language code (default: 'en' for English)
         """
-        # For now, return English as default
-        # This can be enhanced with language detection libraries like langdetect
-        try:
-            # Basic heuristic: if text contains mostly English words, return 'en'
-            if self.spacy_available and self.nlp:
-                doc = self.nlp(text[:100])  # Analyze first 100 characters
-                english_tokens = sum(1 for token in doc if token.is_alpha and token.lang_ == 'en')
-                total_alpha_tokens = sum(1 for token in doc if token.is_alpha)
-                
-                if total_alpha_tokens > 0 and english_tokens / total_alpha_tokens > 0.5:
-                    return 'en'
-            
-            # Fallback: assume English
+        # fastText predicts one line at a time, so newlines are flattened
+        sample = text[:200].replace('\n', ' ').strip()
+        lid = _load_language_identifier()
+        if lid is None or not sample:
             return 'en'
-        except:
+        try:
+            labels, _ = lid.predict(sample)
+            return labels[0].replace('__label__', '')
+        except Exception:
             return 'en'
     
     def _init_enhanced_sentiment_lexicons(self):
         """Initialize comprehensive sentiment analysis lexicons"""
-        self.positive_words = {
+        self.positive_words = frozenset({
             # Basic positive
             'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 
             'love', 'best', 'perfect', 'beautiful', 'awesome', 'brilliant',
@@ -85,9 +255,9 @@ class AdvancedTextAnalyzer:
             'productive', 'effective', 'efficient', 'successful', 'winning',
             'triumphant', 'victorious', 'accomplished', 'fulfilled', 'content',
             'joyful', 'blissful', 'ecstatic', 'elated', 'euphoric', 'radiant'
-        }
+        })
         
-        self.negative_words = {
+        self.negative_words = frozenset({
             # Basic negative
             'bad', 'terrible', 'awful', 'horrible', 'worst', 'hate', 'poor',
             'disappointing', 'useless', 'waste', 'broken', 'wrong', 'failed',
@@ -102,7 +272,7 @@ class AdvancedTextAnalyzer:
             'destructive', 'harmful', 'damaging', 'detrimental', 'toxic',
             'irritating', 'annoying', 'disturbing', 'troubling', 'concerning',
             'alarming', 'worrying', 'distressing', 'heartbreaking', 'devastating'
-        }
+        })
         
         # Intensity modifiers
         self.intensifiers = {
@@ -112,17 +282,39 @@ class AdvancedTextAnalyzer:
             'barely': 0.4, 'hardly': 0.3, 'not': -1.0, 'never': -1.0
         }
         
+        # Sorted arrays for the vectorized lookups in _analyze_sentiment_with_intensity
+        self._positive_array = np.array(sorted(self.positive_words))
+        self._negative_array = np.array(sorted(self.negative_words))
+        self._intensifier_keys = np.array(sorted(self.intensifiers))
+        self._intensifier_values = np.array([self.intensifiers[word] for word in sorted(self.intensifiers)])
+        
         # Emotion categories
         self.emotion_lexicon = {
-            'joy': {'happy', 'joyful', 'delighted', 'pleased', 'content', 'cheerful', 'blissful'},
-            'anger': {'angry', 'furious', 'mad', 'irritated', 'annoyed', 'enraged', 'outraged'},
-            'fear': {'scared', 'frightened', 'afraid', 'terrified', 'anxious', 'worried', 'nervous'},
-            'sadness': {'sad', 'depressed', 'sorrowful', 'melancholy', 'gloomy', 'miserable', 'heartbroken'},
-            'surprise': {'surprised', 'amazed', 'astonished', 'shocked', 'stunned', 'bewildered'},
-            'disgust': {'disgusted', 'revolted', 'repulsed', 'nauseated', 'sickened', 'appalled'},
-            'trust': {'trust', 'confident', 'secure', 'reliable', 'dependable', 'faithful'},
-            'anticipation': {'excited', 'eager', 'hopeful', 'optimistic', 'expectant', 'anticipating'}
+            'joy': frozenset({'happy', 'joyful', 'delighted', 'pleased', 'content', 'cheerful', 'blissful'}),
+            'anger': frozenset({'angry', 'furious', 'mad', 'irritated', 'annoyed', 'enraged', 'outraged'}),
+            'fear': frozenset({'scared', 'frightened', 'afraid', 'terrified', 'anxious', 'worried', 'nervous'}),
+            'sadness': frozenset({'sad', 'depressed', 'sorrowful', 'melancholy', 'gloomy', 'miserable', 'heartbroken'}),
+            'surprise': frozenset({'surprised', 'amazed', 'astonished', 'shocked', 'stunned', 'bewildered'}),
+            'disgust': frozenset({'disgusted', 'revolted', 'repulsed', 'nauseated', 'sickened', 'appalled'}),
+            'trust': frozenset({'trust', 'confident', 'secure', 'reliable', 'dependable', 'faithful'}),
+            'anticipation': frozenset({'excited', 'eager', 'hopeful', 'optimistic', 'expectant', 'anticipating'})
         }
+        
+        # Reverse index over the emotion lexicons (they are disjoint, so one emotion per word)
+        self._word_to_emotion = {word: emotion for emotion, emotion_words in self.emotion_lexicon.items()
+                                 for word in emotion_words}
+        # All emotion words as one alternation, so _detect_emotions scans the lowercased text once
+        self._emotion_pattern = re.compile(
+            r'\b(?:' + '|'.join(map(re.escape, sorted(self._word_to_emotion, key=len, reverse=True))) + r')\b'
+        )
+        
+        # Words counted by _calculate_sentiment_strength
+        self.strong_words = frozenset({"very", "extremely", "absolutely", "completely", "totally", "definitely"})
+        
+        # Opinion markers for _analyze_subjectivity_fallback, matched as substrings in one scan.
+        # None is a substring of another or overlaps one, so findall sees every marker present.
+        self.opinion_words = ["think", "believe", "feel", "opinion", "probably", "maybe", "should", "could"]
+        self._opinion_pattern = re.compile("|".join(self.opinion_words))
     
     def _init_tfidf_vectorizer(self):
         """Initialize TF-IDF components for advanced keyword extraction"""
@@ -130,12 +322,12 @@ class AdvancedTextAnalyzer:
         self.total_documents = 0
         self.vocabulary = set()
     
-    def enhanced_entity_recognition(self, text: str) -> List[Dict[str, Any]]:
+    def enhanced_entity_recognition(self, text: str, doc=None) -> List[Dict[str, Any]]:
         """Enhanced entity recognition with confidence scoring and entity linking"""
         entities = []
         
         if self.spacy_available and self.nlp:
-            entities = self._extract_entities_spacy_enhanced(text)
+            entities = self._extract_entities_spacy_enhanced(text, doc)
         else:
             entities = self._extract_entities_regex_enhanced(text)
         
@@ -144,9 +336,10 @@ class AdvancedTextAnalyzer:
         
         return entities
     
-    def _extract_entities_spacy_enhanced(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_entities_spacy_enhanced(self, text: str, doc=None) -> List[Dict[str, Any]]:
         """Enhanced spaCy entity extraction with additional processing"""
-        doc = self.nlp(text)
+        if doc is None:
+            doc = self._doc(text)
         entities = []
         
         for ent in doc.ents:
@@ -159,7 +352,7 @@ class AdvancedTextAnalyzer:
                 "start": ent.start_char,
                 "end": ent.end_char,
                 "confidence": confidence,
-                "description": spacy.explain(ent.label_) if spacy and hasattr(spacy, 'explain') else ent.label_,
+                "description": _explain_label(ent.label_),
                 "context": self._get_entity_context(ent, doc),
                 "canonical_form": self._get_canonical_form(ent)
             }
@@ -208,22 +401,17 @@ class AdvancedTextAnalyzer:
     def _calculate_context_coherence(self, ent, doc) -> float:
         """Calculate how well entity fits in context"""
         # Simple implementation - can be enhanced with word embeddings
+        # Look for patterns that suggest reliable entities
+        indicators = _COHERENCE_INDICATORS.get(ent.label_)
+        if not indicators:
+            return 0.0
+        
         window_size = 3
         start_idx = max(0, ent.start - window_size)
         end_idx = min(len(doc), ent.end + window_size)
         
         context_tokens = doc[start_idx:end_idx]
-        
-        # Look for patterns that suggest reliable entities
-        coherence_indicators = {
-            "PERSON": ["Mr.", "Mrs.", "Dr.", "CEO", "President", "said", "stated"],
-            "ORG": ["Inc.", "Corp.", "LLC", "Ltd.", "Company", "announced"],
-            "GPE": ["in", "from", "to", "at", "located", "based"]
-        }
-        
-        indicators = coherence_indicators.get(ent.label_, [])
-        found_indicators = sum(1 for token in context_tokens 
-                             if token.text.lower() in [ind.lower() for ind in indicators])
+        found_indicators = sum(1 for token in context_tokens if token.lower_ in indicators)
         
         return min(found_indicators * 0.1, 0.3)
     
@@ -255,32 +443,33 @@ class AdvancedTextAnalyzer:
     
     def _analyze_sentiment_with_intensity(self, text: str) -> Dict[str, Any]:
         """Sentiment analysis with intensity modifiers"""
-        words = re.findall(r'\b\w+\b', text.lower())
+        words = self._features(text).words
         
         total_score = 0.0
         sentiment_words_found = []
         
-        for i, word in enumerate(words):
-            if word in self.positive_words:
-                intensity = 1.0
-                # Check for intensity modifiers in previous 2 words
-                for j in range(max(0, i-2), i):
-                    if words[j] in self.intensifiers:
-                        intensity *= self.intensifiers[words[j]]
-                
-                score = intensity
-                total_score += score
-                sentiment_words_found.append({"word": word, "sentiment": "positive", "score": score})
-                
-            elif word in self.negative_words:
-                intensity = 1.0
-                for j in range(max(0, i-2), i):
-                    if words[j] in self.intensifiers:
-                        intensity *= abs(self.intensifiers[words[j]])
-                
-                score = -intensity
+        if words:
+            tokens = np.array(words)
+            positive = np.isin(tokens, self._positive_array)
+            negative = np.isin(tokens, self._negative_array) & ~positive
+            
+            # Multiplier each token applies to the next two words (1.0 unless it is an intensifier)
+            idx = np.minimum(np.searchsorted(self._intensifier_keys, tokens), len(self._intensifier_keys) - 1)
+            multipliers = np.where(self._intensifier_keys[idx] == tokens, self._intensifier_values[idx], 1.0)
+            previous_1 = np.concatenate(([1.0], multipliers[:-1]))
+            previous_2 = np.concatenate(([1.0, 1.0], multipliers[:-2]))[:len(words)]
+            intensity = previous_2 * previous_1
+            # Negative words ignore the sign of "not"/"never"
+            scores = np.where(positive, intensity, -(np.abs(previous_2) * np.abs(previous_1)))
+            
+            for i in np.flatnonzero(positive | negative).tolist():
+                score = float(scores[i])
                 total_score += score
-                sentiment_words_found.append({"word": word, "sentiment": "negative", "score": score})
+                sentiment_words_found.append({
+                    "word": words[i],
+                    "sentiment": "positive" if positive[i] else "negative",
+                    "score": score
+                })
         
         # Normalize score
         if len(sentiment_words_found) > 0:
@@ -306,13 +495,14 @@ class AdvancedTextAnalyzer:
     
     def _detect_emotions(self, text: str) -> Dict[str, float]:
         """Detect multiple emotions in text"""
-        words = set(re.findall(r'\b\w+\b', text.lower()))
-        emotion_scores = {}
+        # Distinct emotion words found in one regex scan, no tokenization needed
+        found = set(self._emotion_pattern.findall(text.lower()))
+        matches = Counter(map(self._word_to_emotion.__getitem__, found))
         
+        emotion_scores = {}
         for emotion, emotion_words in self.emotion_lexicon.items():
-            matches = len(words & emotion_words)
-            if matches > 0:
-                emotion_scores[emotion] = matches / len(emotion_words)
+            if matches[emotion] > 0:
+                emotion_scores[emotion] = matches[emotion] / len(emotion_words)
         
         # Normalize scores
         if emotion_scores:
@@ -321,26 +511,48 @@ class AdvancedTextAnalyzer:
         
         return emotion_scores
     
-    def advanced_keyword_extraction(self, text: str, top_n: int = 15) -> List[Dict[str, Any]]:
-        """Advanced keyword extraction using multiple algorithms"""
-        keywords = []
-        
+    def advanced_keyword_extraction(self, text: str, top_n: int = 15, doc=None) -> List[Dict[str, Any]]:
+        """Advanced keyword extraction using multiple algorithms (doc: pre-parsed text, optional)"""
+        return self._rank_keywords(text, self._keyword_candidates(text, top_n, doc), top_n)
+    
+    def _keyword_candidates(self, text: str, top_n: int, doc=None) -> Tuple[List[Dict[str, Any]], ...]:
+        """Candidate lists from each extraction method, before they are combined"""
         # Method 1: Enhanced TF-IDF
         tfidf_keywords = self._extract_tfidf_keywords(text, top_n)
         
         # Method 2: TextRank algorithm
-        textrank_keywords = self._extract_textrank_keywords(text, top_n)
+        textrank_keywords = self._extract_textrank_keywords(text, top_n, doc)
         
         # Method 3: Named entity boosting
-        entity_keywords = self._extract_entity_keywords_fallback(text)
+        entity_keywords = self._extract_entity_keywords_fallback(text, doc)
         
         # Method 4: N-gram analysis
         ngram_keywords = self._extract_ngram_keywords(text, top_n)
         
-        # Combine and rank all keywords
-        combined_keywords = self._combine_keyword_scores(
-            tfidf_keywords, textrank_keywords, entity_keywords, ngram_keywords
+        return tfidf_keywords, textrank_keywords, entity_keywords, ngram_keywords
+    
+    @staticmethod
+    def _truncate_candidates(candidates: Tuple[List[Dict[str, Any]], ...], top_n: int) -> Tuple[List[Dict[str, Any]], ...]:
+        """Candidates for a smaller top_n, cut from a larger run instead of extracting again.
+        
+        TF-IDF and TextRank lists are stably sorted and the n-gram lists come from most_common,
+        so each shorter list is a prefix of the longer one; entities don't depend on top_n.
+        """
+        tfidf_keywords, textrank_keywords, entity_keywords, ngram_keywords = candidates
+        ngrams_by_type = defaultdict(list)
+        for kw in ngram_keywords:
+            ngrams_by_type[kw["type"]].append(kw)
+        return (
+            tfidf_keywords[:top_n],
+            textrank_keywords[:top_n],
+            entity_keywords,
+            [kw for ngrams in ngrams_by_type.values() for kw in ngrams[:top_n//2]]
         )
+    
+    def _rank_keywords(self, text: str, candidates: Tuple[List[Dict[str, Any]], ...], top_n: int) -> List[Dict[str, Any]]:
+        """Combine, enhance and rank the candidate lists into the top_n keywords"""
+        # Combine and rank all keywords
+        combined_keywords = self._combine_keyword_scores(*candidates)
         
         # Filter and enhance keywords
         enhanced_keywords = self._enhance_keywords(combined_keywords, text)
@@ -349,7 +561,7 @@ class AdvancedTextAnalyzer:
     
     def _extract_tfidf_keywords(self, text: str, top_n: int) -> List[Dict[str, Any]]:
         """Extract keywords using TF-IDF scoring"""
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
+        words = _ALPHA_WORD_RE.findall(self._features(text).lower)
         word_freq = Counter(words)
         
         # Calculate TF-IDF for each word
@@ -376,51 +588,65 @@ class AdvancedTextAnalyzer:
         
         return keywords
     
-    def _extract_textrank_keywords(self, text: str, top_n: int) -> List[Dict[str, Any]]:
+    def _extract_textrank_keywords(self, text: str, top_n: int, doc=None) -> List[Dict[str, Any]]:
         """Extract keywords using TextRank algorithm (simplified)"""
         if not self.spacy_available:
             return []
         
-        doc = self.nlp(text)
+        if doc is None:
+            doc = self._doc(text)
         
-        # Build word co-occurrence graph
-        sentences = [sent.text for sent in doc.sents]
-        word_cooccurrence = defaultdict(lambda: defaultdict(int))
+        # Build word co-occurrence graph from the sentence spans of the parsed doc,
+        # as one flat counter keyed by (word, neighbor)
+        word_cooccurrence = Counter()
         
-        for sentence in sentences:
-            words = [token.lemma_.lower() for token in self.nlp(sentence) 
+        for sentence in doc.sents:
+            words = [token.lemma_.lower() for token in sentence 
                     if token.is_alpha and not token.is_stop and len(token.text) > 2]
             
-            # Create co-occurrence matrix
+            # Create co-occurrence matrix: each pair within the window of 3, counted both ways
             for i, word1 in enumerate(words):
-                for j, word2 in enumerate(words):
-                    if i != j and abs(i - j) <= 3:  # Window size of 3
-                        word_cooccurrence[word1][word2] += 1
+                for word2 in words[i + 1:i + 4]:
+                    word_cooccurrence[(word1, word2)] += 1
+                    word_cooccurrence[(word2, word1)] += 1
         
         # Simple PageRank implementation
-        words = list(word_cooccurrence.keys())
-        if not words:
+        if not word_cooccurrence:
             return []
-        
-        scores = {word: 1.0 for word in words}
+        words = list(dict.fromkeys(word for word, _ in word_cooccurrence))
+        
+        # Edge list of the co-occurrence graph as parallel arrays, grouped by source word
+        # (stable, so each word's edges keep their first-seen order)
+        index = {word: i for i, word in enumerate(words)}
+        rows = np.fromiter((index[word] for word, _ in word_cooccurrence), dtype=np.intp, count=len(word_cooccurrence))
+        cols = np.fromiter((index[neighbor] for _, neighbor in word_cooccurrence), dtype=np.intp, count=len(word_cooccurrence))
+        weights = np.fromiter(word_cooccurrence.values(), dtype=float, count=len(word_cooccurrence))
+        order = np.argsort(rows, kind="stable")
+        rows, cols, weights = rows[order], cols[order], weights[order]
+        
+        # Each word's edges are preceded by a slot holding the 0.15 damping term, so bincount
+        # adds up every score in the same order as a scalar loop would (0.15 first, then each
+        # neighbor's share)
+        edge_counts = np.bincount(rows, minlength=len(words))
+        slot_rows = np.repeat(np.arange(len(words)), edge_counts + 1)
+        edge_slots = np.arange(len(rows)) + rows + 1
+        out_degree = np.bincount(rows, weights=weights, minlength=len(words))
+        # Share of each neighbor's score that flows along the edge
+        coefficients = 0.85 * (weights / out_degree[cols])
+        contributions = np.full(len(slot_rows), 0.15)
         
         # Iterate PageRank
+        scores = np.ones(len(words))
         for _ in range(10):  # 10 iterations
-            new_scores = {}
-            for word in words:
-                score = 0.15  # Damping factor component
-                for neighbor, weight in word_cooccurrence[word].items():
-                    if neighbor in scores:
-                        neighbor_out_degree = sum(word_cooccurrence[neighbor].values())
-                        score += 0.85 * (weight / neighbor_out_degree) * scores[neighbor]
-                new_scores[word] = score
-            scores = new_scores
+            contributions[edge_slots] = coefficients * scores[cols]
+            scores = np.bincount(slot_rows, weights=contributions, minlength=len(words))
         
-        # Convert to keyword format
+        # Convert to keyword format (stable, so ties keep first-seen order)
         keywords = []
-        for word, score in sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_n]:
+        for i in np.argsort(-scores, kind="stable")[:top_n].tolist():
+            score = float(scores[i])
             keywords.append({
-                "keyword": word,
+                "keyword": words[i],
                 "score": score,
                 "type": "textrank",
                 "centrality": score
@@ -428,12 +654,13 @@ class AdvancedTextAnalyzer:
         
         return keywords
     
-    def _extract_entity_keywords_fallback(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_entity_keywords_fallback(self, text: str, doc=None) -> List[Dict[str, Any]]:
         """Extract keywords based on named entities"""
         keywords = []
         
         if self.spacy_available and self.nlp:
-            doc = self.nlp(text)
+            if doc is None:
+                doc = self._doc(text)
             entity_texts = [ent.text.lower() for ent in doc.ents]
             
             for entity_text in entity_texts:
@@ -449,17 +676,17 @@ class AdvancedTextAnalyzer:
     def _extract_ngram_keywords(self, text: str, top_n: int) -> List[Dict[str, Any]]:
         """Extract n-gram keywords"""
         keywords = []
-        words = text.lower().split()
+        words = self._features(text).split_words
         
-        # Generate bigrams and trigrams
+        # Count bigrams and trigrams as word tuples; only the winners are joined into strings
         for n in [2, 3]:
-            ngrams = [' '.join(words[i:i+n]) for i in range(len(words)-n+1)]
-            ngram_freq = Counter(ngrams)
+            ngram_freq = Counter(zip(*(islice(words, i, None) for i in range(n))))
+            ngram_count = len(words) - n + 1
             
             for ngram, freq in ngram_freq.most_common(top_n//2):
                 keywords.append({
-                    "keyword": ngram,
-                    "score": freq / len(ngrams),
+                    "keyword": ' '.join(ngram),
+                    "score": freq / ngram_count,
                     "type": f"{n}-gram",
                     "frequency": freq
                 })
@@ -492,15 +719,20 @@ class AdvancedTextAnalyzer:
         # This can be enhanced with semantic similarity, context analysis, etc.
         return keywords
     
-    def topic_modeling(self, texts: List[str], num_topics: int = 5) -> Dict[str, Any]:
+    def topic_modeling(self, texts: List[str], num_topics: int = 5, n_process: int = SPACY_N_PROCESS) -> Dict[str, Any]:
         """Simple topic modeling using word co-occurrence"""
         if not texts:
             return {"topics": [], "document_topics": []}
         
+        # Parse every text in one batch and extract keyword candidates once per text;
+        # the document assignment below reuses them for its shorter keyword lists
+        docs = self._docs(texts, n_process=n_process)
+        candidates = [self._keyword_candidates(text, 20, doc) for text, doc in zip(texts, docs)]
+        
         # Combine all texts and extract keywords
         all_keywords = []
-        for text in texts:
-            keywords = self.advanced_keyword_extraction(text, 20)
+        for text, text_candidates in zip(texts, candidates):
+            keywords = self._rank_keywords(text, text_candidates, 20)
             all_keywords.extend([kw["keyword"] for kw in keywords])
         
         # Find most common keyword combinations
@@ -523,15 +755,25 @@ class AdvancedTextAnalyzer:
                 "coherence_score": self._calculate_topic_coherence(topic_keywords, texts)
             })
         
-        # Assign documents to topics
+        # Assign documents to topics: keyword overlap for every document/topic pair at once,
+        # as a product of documents x keywords and topics x keywords indicator matrices
+        keyword_index = {kw: i for i, kw in enumerate(top_keywords)}
+        topic_matrix = np.zeros((len(topics), len(top_keywords)))
+        for topic in topics:
+            topic_matrix[topic["topic_id"], [keyword_index[kw] for kw in topic["keywords"]]] = 1
+        
+        text_keyword_sets = []
+        document_matrix = np.zeros((len(texts), len(top_keywords)))
+        for row, (text, text_candidates) in enumerate(zip(texts, candidates)):
+            text_keywords = {kw["keyword"] for kw in
+                             self._rank_keywords(text, self._truncate_candidates(text_candidates, 10), 10)}
+            text_keyword_sets.append(text_keywords)
+            document_matrix[row, [keyword_index[kw] for kw in text_keywords if kw in keyword_index]] = 1
+        overlaps = (document_matrix @ topic_matrix.T).astype(int)
+        
         document_topics = []
-        for text in texts:
-            text_keywords = set([kw["keyword"] for kw in self.advanced_keyword_extraction(text, 10)])
-            
-            topic_scores = []
-            for topic in topics:
-                overlap = len(text_keywords & set(topic["keywords"]))
-                topic_scores.append(overlap / len(text_keywords) if text_keywords else 0)
+        for text_keywords, overlap_row in zip(text_keyword_sets, overlaps.tolist()):
+            topic_scores = [overlap / len(text_keywords) if text_keywords else 0 for overlap in overlap_row]
             
             best_topic = topic_scores.index(max(topic_scores)) if topic_scores else 0
             document_topics.append({
@@ -556,10 +798,8 @@ class AdvancedTextAnalyzer:
     
     def _analyze_subjectivity_fallback(self, text: str) -> Dict[str, float]:
         """Fallback subjectivity analysis"""
-        # Simple heuristic: count opinion words
-        opinion_words = ["think", "believe", "feel", "opinion", "probably", "maybe", "should", "could"]
-        text_lower = text.lower()
-        opinion_count = sum(1 for word in opinion_words if word in text_lower)
+        # Simple heuristic: count distinct opinion words
+        opinion_count = len(set(self._opinion_pattern.findall(self._features(text).lower)))
         
         return {
             "subjectivity_score": min(opinion_count / 10.0, 1.0),
@@ -569,17 +809,16 @@ class AdvancedTextAnalyzer:
     def _calculate_sentiment_strength(self, text: str) -> float:
         """Calculate overall sentiment strength"""
         # Simple implementation based on word count and intensity
-        words = text.lower().split()
-        strong_words = ["very", "extremely", "absolutely", "completely", "totally", "definitely"]
-        strength = sum(1 for word in words if word in strong_words)
+        words = self._features(text).split_words
+        strength = sum(1 for word in words if word in self.strong_words)
         return min(strength / len(words) * 10, 1.0) if words else 0.0
     
     def _infer_heading_level(self, text: str) -> int:
         """Infer heading level based on text characteristics"""
         # Simple heuristic for heading levels
-        if re.match(r'^\d+\.\s+', text):  # "1. Title"
+        if _NUMBERED_TITLE_RE.match(text):  # "1. Title"
             return 1
-        elif re.match(r'^\d+\.\d+\s+', text):  # "1.1 Subtitle"
+        elif _SUBSECTION_TITLE_RE.match(text):  # "1.1 Subtitle"
             return 2
         elif text.isupper():  # "ALL CAPS HEADING"
             return 1
@@ -595,8 +834,8 @@ class AdvancedTextAnalyzer:
             return 0.0
         
         # Simple complexity based on average word length and sentence length
-        avg_word_length = sum(len(word) for word in words) / len(words)
-        sentences = [s for s in re.split(r'[.!?]+', text) if s.strip()]
+        avg_word_length = sum(map(len, words)) / len(words)
+        sentences = [s for s in _SENTENCE_SPLIT_RE.split(text) if s.strip()]
         avg_sentence_length = len(words) / len(sentences) if sentences else 0
         
         # Normalize to 0-1 scale
@@ -610,33 +849,58 @@ class AdvancedTextAnalyzer:
     
     def text_similarity(self, text1: str, text2: str) -> Dict[str, float]:
         """Calculate text similarity using multiple methods"""
+        return self._compare_profiles(self._similarity_profile(text1), self._similarity_profile(text2))
+    
+    def batch_similarity(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Pairwise text_similarity for every pair of texts, analyzing each text only once"""
+        return self._pairwise_similarity([self._similarity_profile(text) for text in texts])
+    
+    def _pairwise_similarity(self, profiles: List[_SimilarityProfile]) -> List[Dict[str, Any]]:
+        """Similarity scores for every i < j pair of profiles"""
+        # All-pairs keyword cosine as one matrix product over the shared vocabulary
+        vocabulary = {}
+        for profile in profiles:
+            for kw in profile.keywords:
+                vocabulary.setdefault(kw, len(vocabulary))
+        vectors = np.zeros((len(profiles), len(vocabulary)))
+        for row, profile in enumerate(profiles):
+            for kw, score in profile.keywords.items():
+                vectors[row, vocabulary[kw]] = score
+        norms = np.array([profile.keyword_norm for profile in profiles])
+        denominators = np.outer(norms, norms)
+        cosines = np.divide(vectors @ vectors.T, denominators,
+                            out=np.zeros_like(denominators), where=denominators > 0)
+        
+        results = []
+        for i in range(len(profiles)):
+            for j in range(i + 1, len(profiles)):
+                results.append({"text1_index": i, "text2_index": j,
+                                **self._compare_profiles(profiles[i], profiles[j], float(cosines[i, j]))})
+        return results
+    
+    def _compare_profiles(self, profile1: _SimilarityProfile, profile2: _SimilarityProfile,
+                          cosine: Optional[float] = None) -> Dict[str, float]:
+        """Similarity scores between two precomputed text profiles (cosine may be passed in precomputed)"""
         # Method 1: Jaccard similarity on words
-        words1 = set(re.findall(r'\b\w+\b', text1.lower()))
-        words2 = set(re.findall(r'\b\w+\b', text2.lower()))
+        words1 = profile1.word_set
+        words2 = profile2.word_set
         
         jaccard = len(words1 & words2) / len(words1 | words2) if words1 | words2 else 0
         
         # Method 2: Cosine similarity on keyword vectors
-        keywords1 = {kw["keyword"]: kw["score"] for kw in self.advanced_keyword_extraction(text1)}
-        keywords2 = {kw["keyword"]: kw["score"] for kw in self.advanced_keyword_extraction(text2)}
-        
-        all_keywords = set(keywords1.keys()) | set(keywords2.keys())
-        
-        if all_keywords:
-            vec1 = [keywords1.get(kw, 0) for kw in all_keywords]
-            vec2 = [keywords2.get(kw, 0) for kw in all_keywords]
-            
-            dot_product = sum(a * b for a, b in zip(vec1, vec2))
-            norm1 = math.sqrt(sum(a * a for a in vec1))
-            norm2 = math.sqrt(sum(b * b for b in vec2))
-            
-            cosine = dot_product / (norm1 * norm2) if norm1 * norm2 > 0 else 0
-        else:
-            cosine = 0
+        if cosine is None:
+            norms = profile1.keyword_norm * profile2.keyword_norm
+            if norms > 0:
+                # Only keywords present in both texts contribute to the dot product
+                keywords1, keywords2 = sorted((profile1.keywords, profile2.keywords), key=len)
+                dot_product = sum(score * keywords2[kw] for kw, score in keywords1.items() if kw in keywords2)
+                cosine = dot_product / norms
+            else:
+                cosine = 0
         
         # Method 3: Entity overlap
-        entities1 = {ent["text"].lower() for ent in self.enhanced_entity_recognition(text1)}
-        entities2 = {ent["text"].lower() for ent in self.enhanced_entity_recognition(text2)}
+        entities1 = profile1.entities
+        entities2 = profile2.entities
         
         entity_overlap = len(entities1 & entities2) / len(entities1 | entities2) if entities1 | entities2 else 0
         
@@ -651,16 +915,18 @@ class AdvancedTextAnalyzer:
         """Analyze document structure and organization"""
         lines = text.split('\n')
         paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()]
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENTENCE_SPLIT_RE.split(text)
         
         # Detect headings (simple heuristic)
         headings = []
         for i, line in enumerate(lines):
             line = line.strip()
-            if (len(line) < 100 and 
-                (line.isupper() or 
-                 re.match(r'^[A-Z][^.!?]*$', line) or
-                 re.match(r'^\d+\.?\s+[A-Z]', line))):
+            # Cheapest checks first; empty and long lines are never headings
+            if not line or len(line) >= 100:
+                continue
+            if (line.isupper() or 
+                _CAPITALIZED_LINE_RE.match(line) or
+                _NUMBERED_LINE_RE.match(line)):
                 headings.append({
                     "text": line,
                     "line_number": i + 1,
@@ -670,18 +936,19 @@ class AdvancedTextAnalyzer:
         # Analyze paragraph structure
         paragraph_analysis = []
         for i, para in enumerate(paragraphs):
-            para_sentences = re.split(r'[.!?]+', para)
+            sentence_count = sum(1 for s in _SENTENCE_SPLIT_RE.split(para) if s.strip())
+            word_count = len(para.split())
             paragraph_analysis.append({
                 "paragraph_index": i,
-                "sentence_count": len([s for s in para_sentences if s.strip()]),
-                "word_count": len(para.split()),
-                "avg_sentence_length": len(para.split()) / max(len([s for s in para_sentences if s.strip()]), 1),
+                "sentence_count": sentence_count,
+                "word_count": word_count,
+                "avg_sentence_length": word_count / max(sentence_count, 1),
                 "complexity": self._calculate_text_complexity(para)
             })
         
         return {
             "total_paragraphs": len(paragraphs),
-            "total_sentences": len([s for s in sentences if s.strip()]),
+            "total_sentences": sum(1 for s in sentences if s.strip()),
             "headings": headings,
             "paragraph_analysis": paragraph_analysis,
             "document_complexity": self._calculate_document_complexity(text),
@@ -691,14 +958,14 @@ class AdvancedTextAnalyzer:
     def _calculate_readability_score(self, text: str) -> Dict[str, float]:
         """Calculate various readability metrics"""
         words = text.split()
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENTENCE_SPLIT_RE.split(text)
         sentences = [s for s in sentences if s.strip()]
         
         if not words or not sentences:
             return {"flesch_reading_ease": 0, "flesch_kincaid_grade": 0}
         
-        # Count syllables (simple approximation)
-        syllable_count = sum(self._count_syllables(word) for word in words)
+        # Count syllables (simple approximation), once per distinct word
+        syllable_count = sum(_count_syllables(word) * count for word, count in Counter(words).items())
         
         # Average sentence length
         avg_sentence_length = len(words) / len(sentences)
@@ -721,32 +988,15 @@ class AdvancedTextAnalyzer:
     
     def _count_syllables(self, word: str) -> int:
         """Simple syllable counting"""
-        word = word.lower()
-        if not word:
-            return 0
-        
-        vowels = "aeiouy"
-        syllable_count = 0
-        prev_was_vowel = False
-        
-        for char in word:
-            is_vowel = char in vowels
-            if is_vowel and not prev_was_vowel:
-                syllable_count += 1
-            prev_was_vowel = is_vowel
-        
-        # Handle silent e
-        if word.endswith('e') and syllable_count > 1:
-            syllable_count -= 1
-        
-        return max(1, syllable_count)
+        return _count_syllables(word)
     
     # Helper methods for various analyses
     def _get_entity_context(self, ent, doc) -> str:
         """Get context around entity"""
         start = max(0, ent.start - 3)
         end = min(len(doc), ent.end + 3)
-        return " ".join([token.text for token in doc[start:end]])
+        # Span.text slices the original text by character offsets, keeping its spacing
+        return doc[start:end].text
     
     def _get_canonical_form(self, ent) -> str:
         """Get canonical form of entity"""
@@ -754,17 +1004,12 @@ class AdvancedTextAnalyzer:
     
     def _infer_gender(self, name: str) -> str:
         """Simple gender inference for names"""
-        # This is a simplified implementation
-        male_indicators = ['mr.', 'mr', 'sir', 'king', 'prince', 'duke']
-        female_indicators = ['mrs.', 'mrs', 'ms.', 'ms', 'miss', 'queen', 'princess', 'duchess']
-        
-        name_lower = name.lower()
-        for indicator in male_indicators:
-            if indicator in name_lower:
-                return "male"
-        for indicator in female_indicators:
-            if indicator in name_lower:
-                return "female"
+        # This is a simplified implementation: look for a title among the name's words
+        tokens = name.lower().split()
+        if not _MALE_INDICATORS.isdisjoint(tokens):
+            return "male"
+        if not _FEMALE_INDICATORS.isdisjoint(tokens):
+            return "female"
         
         return "unknown"
     
@@ -772,8 +1017,8 @@ class AdvancedTextAnalyzer:
         """Parse temporal expressions"""
         return {
             "normalized_form": text,
-            "type": "date" if re.search(r'\d{4}', text) else "relative",
-            "precision": "day" if re.search(r'\d{1,2}', text) else "year"
+            "type": "date" if _YEAR_RE.search(text) else "relative",
+            "precision": "day" if _DAY_RE.search(text) else "year"
         }
     
     # Additional helper methods would be implemented here...
@@ -795,27 +1040,46 @@ class AdvancedTextAnalyzer:
         all_keywords = []
         all_sentiments = []
         
+        parallel = len(texts) >= PARALLEL_MIN_TEXTS and PARALLEL_WORKERS > 1
+        
+        # Parse all texts in one batch when entities or keywords need the pipeline
+        if options.get("include_entities") or options.get("include_keywords"):
+            docs = self._docs(texts)
+        else:
+            docs = [None] * len(texts)
+        
+        # Sentiment and structure don't touch the pipeline, so large batches fan them out to processes
+        python_results = None
+        if parallel and (options.get("include_sentiment") or options.get("include_structure")):
+            jobs = [(text, bool(options.get("include_sentiment")), bool(options.get("include_structure"))) for text in texts]
+            try:
+                python_results = list(_get_pool().map(_analyze_one, jobs, chunksize=8))
+            except Exception as e:
+                print(f"Warning: parallel batch analysis failed, running serially: {e}")
+                # A broken pool can't be reused; the next large batch starts a new one
+                _shutdown_pool()
+        
         # Analyze each text
-        for i, text in enumerate(texts):
+        for i, (text, doc) in enumerate(zip(texts, docs)):
             analysis = {"text_index": i, "text_length": len(text)}
             
             if options.get("include_entities"):
-                entities = self.enhanced_entity_recognition(text)
+                entities = self.enhanced_entity_recognition(text, doc)
                 analysis["entities"] = entities
                 all_entities.extend(entities)
             
             if options.get("include_keywords"):
-                keywords = self.advanced_keyword_extraction(text)
+                keywords = self.advanced_keyword_extraction(text, doc=doc)
                 analysis["keywords"] = keywords
                 all_keywords.extend(keywords)
             
             if options.get("include_sentiment"):
-                sentiment = self.advanced_sentiment_analysis(text)
+                sentiment = python_results[i][0] if python_results else self.advanced_sentiment_analysis(text)
                 analysis["sentiment"] = sentiment
                 all_sentiments.append(sentiment)
             
             if options.get("include_structure"):
-                structure = self.document_structure_analysis(text)
+                structure = python_results[i][1] if python_results else self.document_structure_analysis(text)
                 analysis["structure"] = structure
             
             results.append(analysis)
@@ -827,15 +1091,22 @@ class AdvancedTextAnalyzer:
             cross_analysis["topics"] = self.topic_modeling(texts)
         
         if options.get("include_similarity") and len(texts) > 1:
+            # Profile each text once (reusing the keywords and entities extracted above when
+            # both were requested) and score all pairs together
+            if options.get("include_entities") and options.get("include_keywords"):
+                profiles = [self._make_similarity_profile(text, analysis["keywords"], analysis["entities"])
+                            for text, analysis in zip(texts, results)]
+            else:
+                profiles = [self._similarity_profile(text) for text in texts]
+            
             similarities = []
-            for i in range(len(texts)):
-                for j in range(i + 1, len(texts)):
-                    sim = self.text_similarity(texts[i], texts[j])
-                    similarities.append({
-                        "text1_index": i,
-                        "text2_index": j,
-                        "similarity": sim
-                    })
+            for pair in self._pairwise_similarity(profiles):
+                i, j = pair.pop("text1_index"), pair.pop("text2_index")
+                similarities.append({
+                    "text1_index": i,
+                    "text2_index": j,
+                    "similarity": pair
+                })
             cross_analysis["similarities"] = similarities
         
         # Aggregate statistics
@@ -0,0 +1,12 @@
+"""
+Response classes shared by the app and its routers
+"""
+
+from typing import Any
+from fastapi.responses import JSONResponse
+import orjson
+
+class DataForgeJSONResponse(JSONResponse):
+    """orjson-rendered responses that, like json.dumps, accept non-string keys and numpy scalars"""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
@@ -3,33 +3,109 @@ Text Analytics Utilities for Data Mining
 Provides NLP-powered analysis: NER, keyword extraction, sentiment analysis, pattern detection
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import re
+import os
+import functools
+import heapq
 from collections import Counter
 
+# nlp.pipe settings for batch parsing (more processes only pay off for large batches)
+SPACY_BATCH_SIZE = int(os.environ.get("DATAFORGE_SPACY_BATCH_SIZE", "64"))
+SPACY_N_PROCESS = int(os.environ.get("DATAFORGE_SPACY_N_PROCESS", "1"))
+
+# Pipeline components whose output each analysis never reads. Skipping them leaves the
+# annotations it does read unchanged (NER and the parser don't depend on the tagger)
+UNUSED_PIPES = {
+    "entities": frozenset({"tagger", "attribute_ruler", "lemmatizer", "parser"}),  # doc.ents
+    "keywords": frozenset({"lemmatizer"}),  # noun_chunks (parser + POS) and doc.ents
+    "summary": frozenset({"tagger", "attribute_ruler", "lemmatizer", "ner"})  # doc.sents
+}
+
+# Patterns used by the analyzers, compiled once at import
+_CURRENCY_PATTERN = r'[$£€¥]\s*\d+(?:,\d{3})*(?:\.\d{2})?'
+_CURRENCY_RE = re.compile(_CURRENCY_PATTERN)
+# Fallback entity types as (label, pattern, confidence), in reporting order
+_ENTITY_PATTERNS = [
+    ("EMAIL", r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', 0.95),
+    ("URL", r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', 0.95),
+    ("DATE", r'(?i:\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b)', 0.85),
+    ("PHONE", r'\b(?:\+?1[-.]?)?\(?[0-9]{3}\)?[-.]?[0-9]{3}[-.]?[0-9]{4}\b', 0.85),
+    ("MONEY", _CURRENCY_PATTERN, 0.9)
+]
+# All of them as named alternatives, so one scan finds every type
+_ENTITY_RE = re.compile('|'.join(f'(?P<{label}>{pattern})' for label, pattern, _ in _ENTITY_PATTERNS))
+_ENTITY_CONFIDENCE = {label: confidence for label, _, confidence in _ENTITY_PATTERNS}
+_ENTITY_ORDER = {label: i for i, (label, _, _) in enumerate(_ENTITY_PATTERNS)}
+_CAPITALIZED_PHRASE_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+_NUMBER_RE = re.compile(r'\b\d+(?:,\d{3})*(?:\.\d+)?\b')
+_PERCENTAGE_RE = re.compile(r'\b\d+(?:\.\d+)?%')
+_MEASUREMENT_RE = re.compile(r'\b\d+(?:\.\d+)?\s*(?:kg|g|lb|oz|km|m|cm|mm|ft|in|L|ml|gal|GB|MB|KB)\b', re.IGNORECASE)
+# A lone '.', '!' or '?' (not part of a run like '...' or '?!'), capturing the next non-space character
+_SENTENCE_END_RE = re.compile(r'(?<![.!?])[.!?](?![.!?])(?=\s*(.?))')
+
+# Lexicons for analyze_sentiment
+_POSITIVE_WORDS = frozenset({
+    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 
+    'love', 'best', 'perfect', 'beautiful', 'awesome', 'brilliant',
+    'outstanding', 'superb', 'magnificent', 'incredible', 'exceptional',
+    'positive', 'happy', 'pleased', 'delighted', 'satisfied'
+})
+_NEGATIVE_WORDS = frozenset({
+    'bad', 'terrible', 'awful', 'horrible', 'worst', 'hate', 'poor',
+    'disappointing', 'useless', 'waste', 'broken', 'wrong', 'failed',
+    'negative', 'sad', 'unhappy', 'upset', 'angry',
+    'frustrated', 'dissatisfied'
+})
+# Both lexicons as one whole-word alternation, matched against lowercased text
+_SENTIMENT_WORD_RE = re.compile(
+    r'\b(?:' + '|'.join(sorted(_POSITIVE_WORDS | _NEGATIVE_WORDS, key=len, reverse=True)) + r')\b'
+)
+
+@functools.lru_cache(maxsize=None)
+def load_spacy_model(name: str = "en_core_web_sm"):
+    """Load a spaCy pipeline once per process; every analyzer (basic and advanced) shares it"""
+    import spacy
+    return spacy.load(name)
+
 class TextAnalyzer:
     """Advanced text analysis utilities for data mining"""
     
     def __init__(self):
         try:
-            import spacy
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = load_spacy_model("en_core_web_sm")
             self.spacy_available = True
         except:
             print("Warning: spaCy not available, using fallback methods")
             self.nlp = None
             self.spacy_available = False
     
-    def extract_entities(self, text: str) -> List[Dict[str, Any]]:
-        """Extract named entities with positions"""
+    def parse_batch(self, texts: List[str], analyses: Tuple[str, ...] = ("entities", "keywords", "summary")) -> List[Any]:
+        """Parse many texts with one batched nlp.pipe call (None per text without spaCy).
+        
+        The Docs can be passed to whichever of extract_entities, extract_keywords and
+        get_text_summary are listed in analyses; components none of them need are skipped.
+        """
+        if not (self.spacy_available and self.nlp):
+            return [None] * len(texts)
+        return list(self.nlp.pipe(texts, batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS,
+                                  disable=self._unused_pipes(*analyses)))
+    
+    def _unused_pipes(self, *analyses: str) -> List[str]:
+        """Components that none of the given analyses read"""
+        return sorted(frozenset.intersection(*(UNUSED_PIPES[analysis] for analysis in analyses)))
+    
+    def extract_entities(self, text: str, doc=None) -> List[Dict[str, Any]]:
+        """Extract named entities with positions (doc: pre-parsed text, optional)"""
         if self.spacy_available and self.nlp:
-            return self._extract_entities_spacy(text)
+            return self._extract_entities_spacy(text, doc)
         else:
             return self._extract_entities_regex(text)
     
-    def _extract_entities_spacy(self, text: str) -> List[Dict[str, Any]]:
+    def _extract_entities_spacy(self, text: str, doc=None) -> List[Dict[str, Any]]:
         """Extract entities using spaCy NER"""
-        doc = self.nlp(text)
+        if doc is None:
+            doc = self.nlp(text, disable=self._unused_pipes("entities"))
         entities = []
         
         for ent in doc.ents:
@@ -47,80 +123,42 @@ class TextAnalyzer:
         """Fallback entity extraction using regex patterns"""
         entities = []
         
-        # Email pattern
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        for match in re.finditer(email_pattern, text):
-            entities.append({
-                "text": match.group(),
-                "label": "EMAIL",
-                "start": match.start(),
-                "end": match.end(),
-                "confidence": 0.95
-            })
-        
-        # URL pattern
-        url_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        for match in re.finditer(url_pattern, text):
-            entities.append({
-                "text": match.group(),
-                "label": "URL",
-                "start": match.start(),
-                "end": match.end(),
-                "confidence": 0.95
-            })
-        
-        # Date patterns
-        date_pattern = r'\b\d{1,2}[-/]\d{1,2}[-/]\d{2,4}\b|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b'
-        for match in re.finditer(date_pattern, text, re.IGNORECASE):
+        # One pass over the text; where matches overlap, the leftmost (then first listed) type wins
+        for match in _ENTITY_RE.finditer(text):
+            label = match.lastgroup
             entities.append({
                 "text": match.group(),
-                "label": "DATE",
+                "label": label,
                 "start": match.start(),
                 "end": match.end(),
-                "confidence": 0.85
+                "confidence": _ENTITY_CONFIDENCE[label]
             })
         
-        # Phone numbers
-        phone_pattern = r'\b(?:\+?1[-.]?)?\(?([0-9]{3})\)?[-.]?([0-9]{3})[-.]?([0-9]{4})\b'
-        for match in re.finditer(phone_pattern, text):
-            entities.append({
-                "text": match.group(),
-                "label": "PHONE",
-                "start": match.start(),
-                "end": match.end(),
-                "confidence": 0.85
-            })
-        
-        # Money/Currency
-        currency_pattern = r'[$£€¥]\s*\d+(?:,\d{3})*(?:\.\d{2})?'
-        for match in re.finditer(currency_pattern, text):
-            entities.append({
-                "text": match.group(),
-                "label": "MONEY",
-                "start": match.start(),
-                "end": match.end(),
-                "confidence": 0.9
-            })
+        # Report grouped by type, in position order within each type
+        entities.sort(key=lambda entity: _ENTITY_ORDER[entity["label"]])
         
         return entities
     
-    def extract_keywords(self, text: str, top_n: int = 10) -> List[Dict[str, Any]]:
-        """Extract important keywords using multiple methods"""
-        keywords = []
+    def extract_keywords(self, text: str, top_n: int = 10, doc=None) -> List[Dict[str, Any]]:
+        """Extract important keywords using multiple methods (doc: pre-parsed text, optional)"""
+        all_keywords = {}
         
         if self.spacy_available and self.nlp:
-            doc = self.nlp(text)
-            
-            # Extract noun phrases
-            noun_phrases = [chunk.text.lower() for chunk in doc.noun_chunks if len(chunk.text) > 3]
-            phrase_counts = Counter(noun_phrases)
+            if doc is None:
+                doc = self.nlp(text, disable=self._unused_pipes("keywords"))
             
-            # Extract named entities as keywords
-            entity_texts = [ent.text.lower() for ent in doc.ents]
-            entity_counts = Counter(entity_texts)
+            # Count noun phrases and named entities straight off the doc. For ASCII text, lowercase
+            # once and slice each span by character offset instead of building every Span's text
+            if doc.text.isascii():
+                lower = doc.text.lower()
+                phrase_counts = Counter(lower[chunk.start_char:chunk.end_char] for chunk in doc.noun_chunks
+                                        if chunk.end_char - chunk.start_char > 3)
+                entity_counts = Counter(lower[ent.start_char:ent.end_char] for ent in doc.ents)
+            else:
+                phrase_counts = Counter(chunk.text.lower() for chunk in doc.noun_chunks if len(chunk.text) > 3)
+                entity_counts = Counter(ent.text.lower() for ent in doc.ents)
             
             # Combine and score
-            all_keywords = {}
             for phrase, count in phrase_counts.most_common(top_n * 2):
                 all_keywords[phrase] = {
                     "keyword": phrase,
@@ -139,8 +177,8 @@ class TextAnalyzer:
                     all_keywords[entity]["score"] += count * 0.5
         else:
             # Fallback: simple word frequency with capitalized words
-            words = re.findall(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', text)
-            word_counts = Counter([w.lower() for w in words])
+            words = _CAPITALIZED_PHRASE_RE.findall(text)
+            word_counts = Counter(w.lower() for w in words)
             
             for word, count in word_counts.most_common(top_n * 2):
                 all_keywords[word] = {
@@ -149,38 +187,23 @@ class TextAnalyzer:
                     "type": "capitalized_word"
                 }
         
-        # Sort by score and return top N
-        sorted_keywords = sorted(all_keywords.values(), key=lambda x: x["score"], reverse=True)
-        return sorted_keywords[:top_n]
+        # Top N by score (ties keep insertion order, as a stable sort would)
+        return heapq.nlargest(top_n, all_keywords.values(), key=lambda x: x["score"])
     
     def detect_language(self, text: str) -> str:
         """Detect text language"""
         if self.spacy_available and self.nlp:
-            doc = self.nlp(text[:1000])  # Sample first 1000 chars
-            return doc.lang_
+            # A Doc's language is the pipeline's, so there is nothing to parse
+            return self.nlp.lang
         return "en"  # Default to English
     
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """Basic sentiment analysis"""
-        # Simple lexicon-based sentiment
-        positive_words = {
-            'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic', 
-            'love', 'best', 'perfect', 'beautiful', 'awesome', 'brilliant',
-            'outstanding', 'superb', 'magnificent', 'incredible', 'exceptional',
-            'positive', 'happy', 'pleased', 'delighted', 'satisfied'
-        }
-        negative_words = {
-            'bad', 'terrible', 'awful', 'horrible', 'worst', 'hate', 'poor',
-            'disappointing', 'useless', 'waste', 'broken', 'wrong', 'failed',
-            'disappointing', 'negative', 'sad', 'unhappy', 'upset', 'angry',
-            'frustrated', 'dissatisfied'
-        }
+        # Simple lexicon-based sentiment: distinct lexicon words found in one scan
+        words = set(_SENTIMENT_WORD_RE.findall(text.lower()))
         
-        text_lower = text.lower()
-        words = set(re.findall(r'\b\w+\b', text_lower))
-        
-        positive_count = len(words & positive_words)
-        negative_count = len(words & negative_words)
+        positive_count = len(words & _POSITIVE_WORDS)
+        negative_count = len(words & _NEGATIVE_WORDS)
         
         total = positive_count + negative_count
         if total == 0:
@@ -219,59 +242,49 @@ class TextAnalyzer:
         }
         
         # Extract numbers
-        number_pattern = r'\b\d+(?:,\d{3})*(?:\.\d+)?\b'
-        numbers = [match.group() for match in re.finditer(number_pattern, text)]
+        numbers = [match.group() for match in _NUMBER_RE.finditer(text)]
         stats["numbers"] = [float(n.replace(',', '')) for n in numbers[:20]]  # Limit to 20
         
         # Extract percentages
-        percentage_pattern = r'\b\d+(?:\.\d+)?%'
-        stats["percentages"] = [m.group() for m in re.finditer(percentage_pattern, text)]
+        stats["percentages"] = [m.group() for m in _PERCENTAGE_RE.finditer(text)]
         
         # Extract currency values
-        currency_pattern = r'[$£€¥]\s*\d+(?:,\d{3})*(?:\.\d{2})?'
-        stats["currencies"] = [m.group() for m in re.finditer(currency_pattern, text)]
+        stats["currencies"] = [m.group() for m in _CURRENCY_RE.finditer(text)]
         
         # Extract measurements
-        measurement_pattern = r'\b\d+(?:\.\d+)?\s*(?:kg|g|lb|oz|km|m|cm|mm|ft|in|L|ml|gal|GB|MB|KB)\b'
-        stats["measurements"] = [m.group() for m in re.finditer(measurement_pattern, text, re.IGNORECASE)]
+        stats["measurements"] = [m.group() for m in _MEASUREMENT_RE.finditer(text)]
         
         return stats
     
-    def get_text_summary(self, text: str) -> Dict[str, Any]:
-        """Get comprehensive text summary"""
+    def get_text_summary(self, text: str, doc=None) -> Dict[str, Any]:
+        """Get comprehensive text summary (doc: pre-parsed text, optional)"""
         words = text.split()
         
         # Count sentences - use spaCy if available, otherwise simple count
         if self.spacy_available and self.nlp:
             # Use spaCy for sentence splitting
-            doc = self.nlp(text)
+            if doc is None:
+                doc = self.nlp(text, disable=self._unused_pipes("summary"))
             sentences = list(doc.sents)
             sentence_count = len(sentences)
         else:
             # Fallback: count likely sentence endings (punctuation at end of text or followed by capital)
             # But be conservative - don't split on abbreviations
-            import re
-            # Simple approach: split on punctuation followed by space and capital letter, or end of text
-            parts = re.split(r'([.!?]+)\s*', text)
-            sentence_count = 1
-            i = 0
-            while i < len(parts) - 1:
-                if parts[i+1] in ['.', '!', '?']:
-                    # Check if followed by capital letter
-                    remaining = ''.join(parts[i+2:])
-                    remaining = remaining.lstrip()
-                    if not remaining or remaining[0].isupper():
-                        sentence_count += 1
-                i += 2
+            sentence_count = 1 + sum(1 for match in _SENTENCE_END_RE.finditer(text)
+                                     if not match.group(1) or match.group(1).isupper())
+        
+        # Word statistics, each computed once with C-level map passes
+        total_word_length = sum(map(len, words))
+        unique_words = len(set(map(str.lower, words)))
         
         return {
             "word_count": len(words),
             "char_count": len(text),
             "sentence_count": sentence_count,
-            "avg_word_length": round(sum(len(w) for w in words) / max(len(words), 1), 2),
+            "avg_word_length": round(total_word_length / max(len(words), 1), 2),
             "avg_sentence_length": round(len(words) / max(sentence_count, 1), 2),
-            "unique_words": len(set(w.lower() for w in words)),
-            "lexical_diversity": round(len(set(w.lower() for w in words)) / max(len(words), 1), 3)
+            "unique_words": unique_words,
+            "lexical_diversity": round(unique_words / max(len(words), 1), 3)
         }
 
 # Global instance
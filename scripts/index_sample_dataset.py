@@ -9,6 +9,11 @@ import sys
 import time
 import json
 
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:  # optional: without it requests buffers the whole body in memory
+    MultipartEncoder = None
+
 BACKEND_URL = os.environ.get('DATAFORGE_BACKEND', 'http://localhost:8000')
 UPLOAD_ENDPOINT = '/api/upload'
 INDEX_ENDPOINT = '/api/rag/index-dataset-file'
@@ -24,10 +29,18 @@ upload_url = BACKEND_URL.rstrip('/') + UPLOAD_ENDPOINT
 index_url = BACKEND_URL.rstrip('/') + INDEX_ENDPOINT
 print('Uploading', CSV_PATH, 'to', upload_url)
 
+# Reuse one pooled connection for the upload, index, polling and search calls
+session = requests.Session()
+
 with open(CSV_PATH, 'rb') as f:
     files = {'file': ('sample_dataset_small.csv', f, 'text/csv')}
     try:
-        uresp = requests.post(upload_url, files=files, timeout=60)
+        if MultipartEncoder is not None:
+            # Stream the multipart body from disk instead of building it in memory
+            enc = MultipartEncoder(fields=files)
+            uresp = session.post(upload_url, data=enc, headers={'Content-Type': enc.content_type}, timeout=600)
+        else:
+            uresp = session.post(upload_url, files=files, timeout=60)
         uresp.raise_for_status()
         print('Upload success:', uresp.status_code)
         upload_body = uresp.json()
@@ -38,7 +51,7 @@ with open(CSV_PATH, 'rb') as f:
             sys.exit(2)
 
         # Call RAG index endpoint with the returned file_id
-        iresp = requests.post(index_url, json={'file_id': file_id, 'dataset_name': 'Sample Dataset'}, timeout=60)
+        iresp = session.post(index_url, json={'file_id': file_id, 'dataset_name': 'Sample Dataset'}, timeout=60)
         if not iresp.ok:
             print('Index request failed:', iresp.status_code, iresp.text)
             sys.exit(2)
@@ -57,9 +70,11 @@ print('\nPolling /api/rag/stats for indexed documents (timeout 60s)...')
 stats_url = BACKEND_URL.rstrip('/') + '/api/rag/stats'
 deadline = time.time() + 60
 docs_found = False
+# Exponential backoff: poll early while indexing is usually quick, then back off
+delay = 0.25
 while time.time() < deadline:
     try:
-        sresp = requests.get(stats_url, timeout=10)
+        sresp = session.get(stats_url, timeout=10)
         if sresp.ok:
             obj = sresp.json()
             stats = obj.get('stats') or obj
@@ -70,7 +85,8 @@ while time.time() < deadline:
                 break
     except Exception as e:
         print('stats check failed:', e)
-    time.sleep(2)
+    time.sleep(min(delay, max(0.0, deadline - time.time())))
+    delay = min(delay * 1.5, 5)
 
 if not docs_found:
     print('Timed out waiting for indexing. If backend queues indexing, wait a bit and re-run checks.')
@@ -82,7 +98,7 @@ context_url = BACKEND_URL.rstrip('/') + '/api/rag/context'
 
 sample_query = 'quick brown fox'
 try:
-    sresp = requests.post(search_url, json={'query': sample_query, 'topK': 5, 'threshold': 0.1, 'searchIn': 'fullText'}, timeout=30)
+    sresp = session.post(search_url, json={'query': sample_query, 'topK': 5, 'threshold': 0.1, 'searchIn': 'fullText'}, timeout=30)
     if sresp.ok:
         print('\nSearch response:')
         print(json.dumps(sresp.json(), indent=2))
@@ -93,7 +109,7 @@ except Exception as e:
 
 try:
     creq = {'query': sample_query, 'topK': 5, 'threshold': 0.1, 'searchIn': 'fullText'}
-    cresp = requests.post(context_url, json=creq, timeout=30)
+    cresp = session.post(context_url, json=creq, timeout=30)
     if cresp.ok:
         print('\nContext response:')
         print(json.dumps(cresp.json(), indent=2))